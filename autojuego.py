@@ -0,0 +1,227 @@
+# Partidas sin interfaz gráfica entre dos IA (autojuego)
+# Reparte las partidas en un grupo de procesos y escribe cada tanda terminada
+# en fragmentos comprimidos, sin guardar todas las partidas en memoria.
+import argparse
+import gzip
+import json
+import os
+import random
+import time
+from itertools import product
+from multiprocessing import Pool
+
+from backend import TicTacToe, IA
+
+LIMITE_MOVIMIENTOS = 200   # Una partida rolling puede no terminar nunca
+TABLAS_POR_REPETICION = 3  # Tablas cuando una posición aparece por tercera vez
+PARTIDAS_POR_TAREA = 200
+PARTIDAS_POR_FRAGMENTO = 100_000
+DIFICULTADES = ['facil', 'medio', 'dificil']
+
+
+def parsear_jugador(texto):
+    """
+    Convierte 'dificil' o 'dificil,tiempo_limite=0.01,profundidad=8,evaluacion=lineas'
+    en una tupla (dificultad, opciones) para construir la IA.
+    """
+    dificultad, *resto = texto.split(',')
+    opciones = {}
+    for par in resto:
+        nombre, valor = par.split('=', 1)
+        try:
+            opciones[nombre] = float(valor) if '.' in valor else int(valor)
+        except ValueError:
+            opciones[nombre] = valor  # Opciones de texto, como evaluacion=lineas
+    return dificultad, opciones
+
+
+# Juegos e IA reutilizados dentro de cada proceso: conservan la tabla de transposición
+_mesas = {}
+
+
+def _mesa(jugador_x, jugador_o):
+    clave = (jugador_x, jugador_o)
+    if clave not in _mesas:
+        juego = TicTacToe()
+        ias = {}
+        for simbolo, texto in (('X', jugador_x), ('O', jugador_o)):
+            dificultad, opciones = parsear_jugador(texto)
+            ias[simbolo] = IA(juego, simbolo, dificultad, **opciones)
+        _mesas[clave] = (juego, ias)
+    return _mesas[clave]
+
+
+def jugar_partida(jugador_x, jugador_o, semilla=None, limite=LIMITE_MOVIMIENTOS,
+                  repeticiones=TABLAS_POR_REPETICION):
+    """
+    Juega una partida completa entre dos IA. Termina en tablas tras `limite`
+    movimientos o cuando una posición aparece `repeticiones` veces (None no lo revisa).
+    Retorna un dict con los jugadores, la semilla, el ganador ('X', 'O' o None),
+    el motivo de las tablas ('repeticion', 'limite' o None) y la lista de casillas jugadas.
+    """
+    random.seed(semilla)
+    juego, ias = _mesa(jugador_x, jugador_o)
+    juego.tablas_por_repeticion = repeticiones
+    juego.limite_movimientos = limite
+    juego.reiniciar()
+
+    movimientos = []
+    ganador = tablas = None
+    while True:
+        casilla = ias[juego.jugador_actual].obtener_movimiento()
+        juego.hacer_movimiento(casilla)
+        movimientos.append(casilla)
+        if juego.verificar_ganador(juego.jugador_actual):
+            ganador = juego.jugador_actual
+            break
+        juego.cambiar_turno()
+        tablas = juego.verificar_tablas()
+        if tablas:
+            break
+
+    return {'x': jugador_x, 'o': jugador_o, 'semilla': semilla,
+            'ganador': ganador, 'tablas': tablas, 'movimientos': movimientos}
+
+
+def _jugar_tanda(tarea):
+    """Punto de entrada de los procesos: juega una tanda de partidas seguidas"""
+    jugador_x, jugador_o, semilla, cantidad, limite, repeticiones = tarea
+    return [jugar_partida(jugador_x, jugador_o, semilla + i, limite, repeticiones) for i in range(cantidad)]
+
+
+class Estadisticas:
+    """Acumula resultados partida a partida, sin conservar las partidas"""
+
+    def __init__(self):
+        self.por_enfrentamiento = {}
+
+    def agregar(self, partida):
+        clave = f"{partida['x']} vs {partida['o']}"
+        datos = self.por_enfrentamiento.setdefault(
+            clave, {'partidas': 0, 'X': 0, 'O': 0, 'tablas': 0, 'repeticiones': 0, 'movimientos': 0})
+        datos['partidas'] += 1
+        datos[partida['ganador'] or 'tablas'] += 1
+        # Los fragmentos anteriores a las tablas por repetición no traen el motivo
+        if partida.get('tablas') == 'repeticion':
+            datos['repeticiones'] += 1
+        datos['movimientos'] += len(partida['movimientos'])
+
+    def resumen(self):
+        resumen = {}
+        for clave, datos in self.por_enfrentamiento.items():
+            n = datos['partidas']
+            resumen[clave] = dict(datos, victorias_x=datos['X'] / n, victorias_o=datos['O'] / n,
+                                  largo_promedio=datos['movimientos'] / n)
+        return resumen
+
+
+class EscritorFragmentos:
+    """Escribe partidas como JSON por línea en archivos gzip que rotan por tamaño"""
+
+    def __init__(self, directorio, partidas_por_fragmento=PARTIDAS_POR_FRAGMENTO):
+        os.makedirs(directorio, exist_ok=True)
+        self.directorio = directorio
+        self.partidas_por_fragmento = partidas_por_fragmento
+        self.numero = 0
+        self.en_fragmento = 0
+        self._archivo = None
+
+    def escribir(self, partida):
+        if self._archivo is None or self.en_fragmento >= self.partidas_por_fragmento:
+            self._rotar()
+        self._archivo.write(json.dumps(partida, separators=(',', ':')) + '\n')
+        self.en_fragmento += 1
+
+    def _rotar(self):
+        if self._archivo is not None:
+            self._archivo.close()
+            self.numero += 1
+        ruta = os.path.join(self.directorio, f"partidas-{self.numero:05d}.jsonl.gz")
+        self._archivo = gzip.open(ruta, 'wt', encoding='utf-8', compresslevel=5)
+        self.en_fragmento = 0
+
+    def cerrar(self):
+        if self._archivo is not None:
+            self._archivo.close()
+            self._archivo = None
+
+
+def leer_fragmentos(directorio):
+    """Recorre las partidas de todos los fragmentos una por una"""
+    for nombre in sorted(os.listdir(directorio)):
+        if nombre.startswith('partidas-') and nombre.endswith('.jsonl.gz'):
+            with gzip.open(os.path.join(directorio, nombre), 'rt', encoding='utf-8') as f:
+                for linea in f:
+                    yield json.loads(linea)
+
+
+def generar_tareas(enfrentamientos, partidas, semilla, por_tarea, limite, repeticiones):
+    for jugador_x, jugador_o in enfrentamientos:
+        for inicio in range(0, partidas, por_tarea):
+            cantidad = min(por_tarea, partidas - inicio)
+            yield jugador_x, jugador_o, semilla + inicio, cantidad, limite, repeticiones
+
+
+def ejecutar(enfrentamientos, partidas, directorio, procesos=None, semilla=0,
+             por_tarea=PARTIDAS_POR_TAREA, limite=LIMITE_MOVIMIENTOS,
+             repeticiones=TABLAS_POR_REPETICION, al_progresar=None):
+    """
+    Juega `partidas` partidas por enfrentamiento en un grupo de procesos.
+    Cada tanda se escribe en cuanto termina. Retorna las Estadisticas.
+    """
+    tareas = generar_tareas(enfrentamientos, partidas, semilla, por_tarea, limite, repeticiones)
+    estadisticas = Estadisticas()
+    escritor = EscritorFragmentos(directorio)
+    pool = None
+    try:
+        if procesos == 1:
+            tandas = map(_jugar_tanda, tareas)
+        else:
+            pool = Pool(procesos)
+            tandas = pool.imap_unordered(_jugar_tanda, tareas)
+        for tanda in tandas:
+            for partida in tanda:
+                escritor.escribir(partida)
+                estadisticas.agregar(partida)
+            if al_progresar:
+                al_progresar(estadisticas)
+    finally:
+        if pool is not None:
+            pool.terminate()
+        escritor.cerrar()
+
+    with open(os.path.join(directorio, 'resumen.json'), 'w', encoding='utf-8') as f:
+        json.dump(estadisticas.resumen(), f, indent=2)
+    return estadisticas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Partidas IA contra IA sin interfaz gráfica")
+    parser.add_argument('--enfrentamiento', nargs=2, action='append', metavar=('X', 'O'),
+                        help="Jugadores como 'dificil' o 'dificil,tiempo_limite=0.01' (repetible)")
+    parser.add_argument('--partidas', type=int, default=1000, help="Partidas por enfrentamiento")
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--por-tarea', type=int, default=PARTIDAS_POR_TAREA)
+    parser.add_argument('--limite', type=int, default=LIMITE_MOVIMIENTOS)
+    parser.add_argument('--repeticiones', type=int, default=TABLAS_POR_REPETICION,
+                        help="Tablas cuando una posición aparece tantas veces (0 no lo revisa)")
+    parser.add_argument('--destino', default='partidas')
+    args = parser.parse_args(argv)
+
+    # Sin enfrentamientos explícitos se juegan todos los pares de dificultades
+    enfrentamientos = args.enfrentamiento or list(product(DIFICULTADES, repeat=2))
+    inicio = time.perf_counter()
+    estadisticas = ejecutar(enfrentamientos, args.partidas, args.destino, args.procesos,
+                            args.semilla, args.por_tarea, args.limite, args.repeticiones or None)
+    duracion = time.perf_counter() - inicio
+
+    total = sum(d['partidas'] for d in estadisticas.por_enfrentamiento.values())
+    for clave, datos in estadisticas.resumen().items():
+        print(f"{clave}: X {datos['X']}  O {datos['O']}  tablas {datos['tablas']} "
+              f"({datos['repeticiones']} por repetición)  largo promedio {datos['largo_promedio']:.1f}")
+    print(f"{total} partidas en {duracion:.1f} s ({total / duracion * 3600:,.0f} por hora)")
+
+
+if __name__ == '__main__':
+    main()
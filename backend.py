@@ -1,28 +1,477 @@
 # Lógica del juego Tic Tac Toe Rolling
 # Cada jugador solo puede tener 3 fichas - la más antigua desaparece
 import random
+import threading
+import time
+from array import array
+from collections import OrderedDict, deque
+
+
+class Geometria:
+    """
+    Tablas precalculadas de un tablero de n x n donde gana quien alinea k fichas.
+    Las casillas se numeran por filas y el bit i de una máscara es la casilla i.
+    """
+
+    def __init__(self, n=3, k=3):
+        if not 1 <= k <= n:
+            raise ValueError(f"No se puede alinear {k} en un tablero de {n}x{n}")
+        self.n = n
+        self.k = k
+        self.num_casillas = n * n
+        self.completo = (1 << self.num_casillas) - 1
+        # Bits que ocupa cada casilla dentro de una cola empaquetada
+        self.bits_casilla = max(1, (self.num_casillas - 1).bit_length())
+        self.mascara_casilla = (1 << self.bits_casilla) - 1
+
+        # Combinaciones ganadoras y el índice casilla -> líneas que pasan por ella
+        self.win_combinations = self._generar_lineas()
+        self.mascaras_ganadoras = [sum(1 << i for i in combo) for combo in self.win_combinations]
+        self.lineas_por_casilla = [[] for _ in range(self.num_casillas)]
+        for combo, linea in zip(self.win_combinations, self.mascaras_ganadoras):
+            for i in combo:
+                self.lineas_por_casilla[i].append((combo, linea))
+        self.mascaras_por_casilla = [[linea for _, linea in lineas] for lineas in self.lineas_por_casilla]
+
+        # Preferencia: más líneas primero y luego cercanía al centro
+        # (en 3x3 queda centro, esquinas, lados)
+        medio = (n - 1) / 2
+        self.preferencias = sorted(range(self.num_casillas), key=lambda i: (
+            -len(self.lineas_por_casilla[i]), abs(i // n - medio) + abs(i % n - medio), i))
+        self.rango_preferencia = [0] * self.num_casillas
+        for rango, i in enumerate(self.preferencias):
+            self.rango_preferencia[i] = rango
+        self.centro = self.num_casillas // 2 if n % 2 else None
+
+        # Las 8 simetrías del cuadrado (rotaciones y reflejos) como permutaciones
+        # de casillas, y sus inversas; preservan las líneas ganadoras
+        u = n - 1
+        transformaciones = [
+            lambda f, c: (f, c), lambda f, c: (c, u - f), lambda f, c: (u - f, u - c),
+            lambda f, c: (u - c, f), lambda f, c: (f, u - c), lambda f, c: (u - f, c),
+            lambda f, c: (c, f), lambda f, c: (u - c, u - f),
+        ]
+        self.simetrias = []
+        self.inversas = []
+        for transformar in transformaciones:
+            permutacion = [0] * self.num_casillas
+            inversa = [0] * self.num_casillas
+            for i in range(self.num_casillas):
+                f, c = transformar(i // n, i % n)
+                permutacion[i] = f * n + c
+                inversa[f * n + c] = i
+            self.simetrias.append(permutacion)
+            self.inversas.append(inversa)
+
+        # Casillas vecinas (incluida la propia) para acotar la búsqueda en tableros grandes
+        self.vecindad = [
+            sum(1 << (f * n + c)
+                for f in range(max(0, i // n - 1), min(n, i // n + 2))
+                for c in range(max(0, i % n - 1), min(n, i % n + 2)))
+            for i in range(self.num_casillas)
+        ]
+
+        # Casillas libres precalculadas para cada máscara de ocupación, si caben
+        self._libres = None
+        if self.num_casillas <= 12:
+            self._libres = [self._calcular_libres(ocupadas) for ocupadas in range(1 << self.num_casillas)]
+
+        # Evaluación de cada tablero, calculada al primer uso (ver tabla_evaluacion)
+        self._evaluaciones = None
+
+        # Claves de Zobrist por máximo de fichas, creadas al primer uso (ver claves_zobrist)
+        self._zobrist = {}
+
+    def _generar_lineas(self):
+        n, k = self.n, self.k
+        lineas = []
+        for df, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):  # Filas, columnas y diagonales
+            for f in range(n):
+                for c in range(n):
+                    fin_f, fin_c = f + df * (k - 1), c + dc * (k - 1)
+                    if 0 <= fin_f < n and 0 <= fin_c < n:
+                        lineas.append([(f + df * j) * n + c + dc * j for j in range(k)])
+        return lineas
+
+    def _calcular_libres(self, ocupadas):
+        libres = ~ocupadas & self.completo
+        casillas = []
+        while libres:
+            bajo = libres & -libres
+            casillas.append(bajo.bit_length() - 1)
+            libres ^= bajo
+        return casillas
+
+    def casillas_libres(self, ocupadas):
+        """Retorna la lista de casillas vacías en orden (puede ser compartida: no modificarla)"""
+        if self._libres is not None:
+            return self._libres[ocupadas]
+        return self._calcular_libres(ocupadas)
+
+    def evaluar_lineas(self, mias, suyas):
+        """Puntaje heurístico para el dueño de `mias`: fichas en líneas abiertas y centro"""
+        puntaje = 0
+        for linea in self.mascaras_ganadoras:
+            mis_fichas = (mias & linea).bit_count()
+            fichas_oponente = (suyas & linea).bit_count()
+            
+            if fichas_oponente == 0:
+                puntaje += mis_fichas
+            if mis_fichas == 0:
+                puntaje -= fichas_oponente
+        
+        # Bonus por centro
+        if self.centro is not None:
+            puntaje += 2 * ((mias >> self.centro) & 1) - 2 * ((suyas >> self.centro) & 1)
+        return puntaje
+
+    def tabla_evaluacion(self):
+        """
+        Retorna evaluar_lineas de todos los tableros desde el punto de vista de X,
+        indexada por x | o << num_casillas: las máscaras que las jugadas ya
+        mantienen. Hasta 9 casillas (3^9 tableros en 2^18 bytes); None si no cabe.
+        """
+        if self._evaluaciones is None and self.num_casillas <= MAX_CASILLAS_EVALUACION:
+            n = self.num_casillas
+            tabla = array('b', bytes(1 << (2 * n)))
+            for x in range(1 << n):
+                # Recorre todos los subconjuntos o de las casillas libres
+                libres = ~x & self.completo
+                o = libres
+                while True:
+                    tabla[x | o << n] = self.evaluar_lineas(x, o)
+                    if not o:
+                        break
+                    o = (o - 1) & libres
+            self._evaluaciones = tabla
+        return self._evaluaciones
+
+    def claves_zobrist(self, maximo):
+        """
+        Retorna (claves, clave_turno) para hashear estados con hasta `maximo`
+        fichas por jugador: claves[jugador][edad][casilla] (edad 0 es la ficha
+        más antigua) y la clave que se agrega cuando juega O. La semilla es fija:
+        el mismo estado tiene el mismo hash en todos los procesos.
+        """
+        if maximo not in self._zobrist:
+            rng = random.Random(f"zobrist-{self.n}-{self.k}-{maximo}")
+            claves = [[[rng.getrandbits(64) for _ in range(self.num_casillas)] for _ in range(maximo)]
+                      for _ in range(2)]
+            self._zobrist[maximo] = (claves, rng.getrandbits(64))
+        return self._zobrist[maximo]
+
+    def candidatas(self, ocupadas):
+        """
+        Casillas vacías que vale la pena buscar. En tableros de más de 3x3
+        solo las vecinas de alguna ficha; en 3x3 todas.
+        """
+        if self.n <= 3 or not ocupadas:
+            return self.casillas_libres(ocupadas)
+        cerca = 0
+        resto = ocupadas
+        while resto:
+            bajo = resto & -resto
+            cerca |= self.vecindad[bajo.bit_length() - 1]
+            resto ^= bajo
+        return self.casillas_libres(ocupadas | (~cerca & self.completo))
+
+    def tiene_linea(self, mascara):
+        """
+        Verifica si una máscara de fichas contiene alguna combinación ganadora.
+        Revisa todas las líneas; en juego usar linea_por_casilla con la última ficha.
+        """
+        for linea in self.mascaras_ganadoras:
+            if mascara & linea == linea:
+                return True
+        return False
+
+    def linea_por_casilla(self, mascara, casilla):
+        """
+        Retorna la combinación ganadora que pasa por la casilla, o None.
+        Basta revisar la última ficha colocada: quitar la ficha más antigua
+        nunca completa una línea, así que una línea nueva siempre la incluye.
+        """
+        for combo, linea in self.lineas_por_casilla[casilla]:
+            if mascara & linea == linea:
+                return combo
+        return None
+
+    def gana_con(self, mascara, casilla):
+        """Verifica si la ficha colocada en la casilla completa una línea"""
+        for linea in self.mascaras_por_casilla[casilla]:
+            if mascara & linea == linea:
+                return True
+        return False
+
+
+# Tableros con evaluación precalculada: la tabla ocupa 2^(2 * casillas) bytes
+MAX_CASILLAS_EVALUACION = 9
+
+# Geometrías compartidas por todos los juegos del mismo tamaño
+_geometrias = {}
+
+
+def obtener_geometria(n=3, k=3):
+    if (n, k) not in _geometrias:
+        _geometrias[(n, k)] = Geometria(n, k)
+    return _geometrias[(n, k)]
+
+
+# Tablero clásico de 3x3, usado por la tabla de resultados y el simulador por lotes
+GEOMETRIA_CLASICA = obtener_geometria(3, 3)
+NUM_CASILLAS = GEOMETRIA_CLASICA.num_casillas
+TABLERO_COMPLETO = GEOMETRIA_CLASICA.completo
+BITS_CASILLA = GEOMETRIA_CLASICA.bits_casilla
+MASCARA_CASILLA = GEOMETRIA_CLASICA.mascara_casilla
+WIN_COMBINATIONS = GEOMETRIA_CLASICA.win_combinations
+MASCARAS_GANADORAS = GEOMETRIA_CLASICA.mascaras_ganadoras
+LINEAS_POR_CASILLA = GEOMETRIA_CLASICA.lineas_por_casilla
+MASCARAS_POR_CASILLA = GEOMETRIA_CLASICA.mascaras_por_casilla
+tiene_linea = GEOMETRIA_CLASICA.tiene_linea
+linea_por_casilla = GEOMETRIA_CLASICA.linea_por_casilla
+gana_con = GEOMETRIA_CLASICA.gana_con
+
+
+def desempaquetar_cola(cola, cantidad, bits=BITS_CASILLA):
+    """Convierte una cola empaquetada en la lista de casillas (la más antigua primero)"""
+    mascara = (1 << bits) - 1
+    return [(cola >> (bits * i)) & mascara for i in range(cantidad)]
+
+
+class EstadoBits:
+    """
+    Estado compacto del juego rolling.
+    - x, o: máscaras de ocupación de cada jugador
+    - cola_x, cola_o: movimientos empaquetados, geo.bits_casilla bits por casilla,
+      con la ficha más antigua en los bits más bajos
+    - turno: 0 si juega X, 1 si juega O
+    - geo: Geometria del tablero, compartida entre estados
+    El largo de cada cola es el número de bits activos de su máscara.
+    """
+    __slots__ = ('x', 'o', 'cola_x', 'cola_o', 'turno', 'geo')
+
+    def __init__(self, x=0, o=0, cola_x=0, cola_o=0, turno=0, geo=GEOMETRIA_CLASICA):
+        self.x = x
+        self.o = o
+        self.cola_x = cola_x
+        self.cola_o = cola_o
+        self.turno = turno
+        self.geo = geo
+
+    def copiar(self):
+        return EstadoBits(self.x, self.o, self.cola_x, self.cola_o, self.turno, self.geo)
+
+    def clave(self):
+        """Empaqueta el estado completo (tablero, edades y turno) en un solo entero"""
+        n = self.geo.num_casillas
+        cola = self.geo.bits_casilla * n
+        return ((((self.cola_x << cola | self.cola_o) << n | self.x) << n | self.o) << 1) | self.turno
+
+    def zobrist(self, maximo):
+        """Hash de Zobrist de 64 bits del estado completo, calculado desde cero"""
+        claves, clave_turno = self.geo.claves_zobrist(maximo)
+        bits = self.geo.bits_casilla
+        mascara = self.geo.mascara_casilla
+        valor = clave_turno if self.turno else 0
+        for por_edad, cola, fichas in ((claves[0], self.cola_x, self.x), (claves[1], self.cola_o, self.o)):
+            for edad in range(fichas.bit_count()):
+                valor ^= por_edad[edad][(cola >> (bits * edad)) & mascara]
+        return valor
+
+    def casilla_disponible(self, casilla):
+        """Verifica que la casilla exista en el tablero y esté vacía"""
+        return 0 <= casilla < self.geo.num_casillas and not ((self.x | self.o) >> casilla) & 1
+
+    def casillas_disponibles(self):
+        return self.geo.casillas_libres(self.x | self.o)
+
+    def ultima(self, jugador):
+        """Retorna la casilla de la ficha más reciente del jugador, o None"""
+        cola, fichas = (self.cola_x, self.x) if jugador == 'X' else (self.cola_o, self.o)
+        n = fichas.bit_count()
+        if n == 0:
+            return None
+        return (cola >> (self.geo.bits_casilla * (n - 1))) & self.geo.mascara_casilla
+
+    def canonica(self):
+        """
+        Retorna (clave, simetria): la clave mínima del estado, con las edades de
+        las fichas, entre las 8 simetrías del tablero, y el índice de la
+        simetría que lleva este estado a esa forma canónica.
+        """
+        geo = self.geo
+        x = desempaquetar_cola(self.cola_x, self.x.bit_count(), geo.bits_casilla)
+        o = desempaquetar_cola(self.cola_o, self.o.bit_count(), geo.bits_casilla)
+        mejor = None
+        mejor_simetria = 0
+        for indice, permutacion in enumerate(geo.simetrias):
+            clave = (tuple([permutacion[c] for c in x]), tuple([permutacion[c] for c in o]))
+            if mejor is None or clave < mejor:
+                mejor = clave
+                mejor_simetria = indice
+        return (self.turno,) + mejor, mejor_simetria
+
+    def fichas(self, jugador):
+        """Retorna la máscara de fichas del jugador ('X' u 'O')"""
+        return self.x if jugador == 'X' else self.o
+
+    def colocar(self, casilla, maximo):
+        """
+        Coloca una ficha del jugador en turno, sin cambiar el turno.
+        Retorna la casilla eliminada o None.
+        """
+        bits = self.geo.bits_casilla
+        eliminada = None
+        if self.turno == 0:
+            n = self.x.bit_count()
+            if n >= maximo:
+                eliminada = self.cola_x & self.geo.mascara_casilla
+                self.cola_x >>= bits
+                self.x ^= 1 << eliminada
+                n -= 1
+            self.cola_x |= casilla << (bits * n)
+            self.x |= 1 << casilla
+        else:
+            n = self.o.bit_count()
+            if n >= maximo:
+                eliminada = self.cola_o & self.geo.mascara_casilla
+                self.cola_o >>= bits
+                self.o ^= 1 << eliminada
+                n -= 1
+            self.cola_o |= casilla << (bits * n)
+            self.o |= 1 << casilla
+        return eliminada
+
+    def mover(self, casilla, maximo):
+        """Juega la casilla para el jugador en turno y pasa el turno. Retorna la casilla eliminada o None."""
+        eliminada = self.colocar(casilla, maximo)
+        self.turno ^= 1
+        return eliminada
+
+    def deshacer(self, casilla, eliminada):
+        """
+        Revierte mover(casilla) exactamente: devuelve el turno, quita la ficha
+        más reciente y restaura la eliminada como la más antigua.
+        """
+        self.turno ^= 1
+        bits = self.geo.bits_casilla
+        if self.turno == 0:
+            n = self.x.bit_count() - 1
+            self.cola_x &= ~(self.geo.mascara_casilla << (bits * n))
+            self.x ^= 1 << casilla
+            if eliminada is not None:
+                self.cola_x = (self.cola_x << bits) | eliminada
+                self.x |= 1 << eliminada
+        else:
+            n = self.o.bit_count() - 1
+            self.cola_o &= ~(self.geo.mascara_casilla << (bits * n))
+            self.o ^= 1 << casilla
+            if eliminada is not None:
+                self.cola_o = (self.cola_o << bits) | eliminada
+                self.o |= 1 << eliminada
+
+    def simular(self, casilla, jugador, maximo):
+        """Retorna un nuevo estado con la ficha del jugador colocada"""
+        estado = self.copiar()
+        estado.turno = 0 if jugador == 'X' else 1
+        estado.colocar(casilla, maximo)
+        return estado
+
+    def sucesor(self, casilla, maximo):
+        """Retorna un nuevo estado tras jugar el jugador en turno y pasar el turno"""
+        estado = self.copiar()
+        estado.colocar(casilla, maximo)
+        estado.turno ^= 1
+        return estado
+
+    def tablero(self):
+        """Retorna el tablero como lista de caracteres, una por casilla"""
+        return [
+            'X' if (self.x >> i) & 1 else 'O' if (self.o >> i) & 1 else ' '
+            for i in range(self.geo.num_casillas)
+        ]
+
+
+LARGO_HISTORIAL = 32   # Movimientos que deshacer_movimiento puede revertir por defecto
+
 
 class TicTacToe:
-    def __init__(self):
-        self.tablero = [' ' for _ in range(9)]
+    def __init__(self, tamano=3, en_linea=3, max_fichas=3, tablas_por_repeticion=None,
+                 limite_movimientos=None, largo_historial=LARGO_HISTORIAL):
+        # Tablero de tamano x tamano; gana quien alinea en_linea fichas
+        self.geometria = obtener_geometria(tamano, en_linea)
+        self.tamano = tamano
+        self.en_linea = en_linea
         self.ganador_actual = None
-        self.jugador_actual = 'X'
-        self.numero_maximo_de_mov = 3
-        
-        # Historial de movimientos por jugador
-        self.x_moves = []
-        self.o_moves = []
-        
-        # Combinaciones ganadoras
-        self.win_combinations = [
-            [0, 1, 2], [3, 4, 5], [6, 7, 8],  # Filas
-            [0, 3, 6], [1, 4, 7], [2, 5, 8],  # Columnas
-            [0, 4, 8], [2, 4, 6]              # Diagonales
-        ]
+        self.numero_maximo_de_mov = max_fichas
+        
+        # Como las fichas desaparecen una partida puede no terminar: verificar_tablas
+        # la declara tablas si una posición se repite tantas veces o tras tantos
+        # movimientos. None desactiva cada regla; las repeticiones solo se cuentan
+        # si la regla está activa (fijarla antes de empezar o de reiniciar).
+        self.tablas_por_repeticion = tablas_por_repeticion
+        self.limite_movimientos = limite_movimientos
+        
+        # Movimientos que se pueden deshacer: los más viejos se descartan. 0 no
+        # guarda ninguno (sesiones largas del servidor), None no pone límite
+        self.largo_historial = largo_historial
+        
+        # El estado real vive en bits; tablero, x_moves y o_moves son vistas.
+        # hash es su Zobrist, que hacer_movimiento y cambiar_turno actualizan
+        self._claves_zobrist, self._clave_turno = self.geometria.claves_zobrist(max_fichas)
+        self.estado = EstadoBits(geo=self.geometria)
+        
+        # Combinaciones ganadoras, generadas por la geometría
+        self.win_combinations = self.geometria.win_combinations
+        
+        # Función opcional (casilla, casilla_eliminada) llamada tras cada movimiento,
+        # por ejemplo para grabar la partida (ver registro.py)
+        self.al_mover = None
+    
+    @property
+    def estado(self):
+        return self._estado
+    
+    @estado.setter
+    def estado(self, estado):
+        """Reemplazar el estado empieza desde él: sin historial ni repeticiones previas"""
+        self._estado = estado
+        self.hash = estado.zobrist(self.numero_maximo_de_mov)
+        self.num_movimientos = 0
+        # (casilla, eliminada, turno, ganador previo, hash previo) de los últimos movimientos
+        self.historial = deque(maxlen=self.largo_historial) if self.largo_historial != 0 else None
+        # Veces que apareció cada posición (por hash) con un jugador por mover
+        self.repeticiones = {self.hash: 1} if self.tablas_por_repeticion is not None else {}
+    
+    @property
+    def tablero(self):
+        """Vista del tablero como lista de caracteres (solo lectura)"""
+        return self._estado.tablero()
+    
+    @property
+    def jugador_actual(self):
+        return 'X' if self._estado.turno == 0 else 'O'
+    
+    @jugador_actual.setter
+    def jugador_actual(self, jugador):
+        turno = 0 if jugador == 'X' else 1
+        if turno != self._estado.turno:
+            self._estado.turno = turno
+            self.hash ^= self._clave_turno
+    
+    @property
+    def x_moves(self):
+        """Historial de movimientos de X, el más antiguo primero (solo lectura)"""
+        return desempaquetar_cola(self._estado.cola_x, self._estado.x.bit_count(), self.geometria.bits_casilla)
+    
+    @property
+    def o_moves(self):
+        """Historial de movimientos de O, el más antiguo primero (solo lectura)"""
+        return desempaquetar_cola(self._estado.cola_o, self._estado.o.bit_count(), self.geometria.bits_casilla)
     
     def casilla_disponible(self, casilla):
         """Verifica si una casilla está disponible"""
-        return self.tablero[casilla] == ' '
+        return self._estado.casilla_disponible(casilla)
     
     def obtener_movimientos_actuales(self):
         """Retorna la lista de movimientos del jugador actual"""
@@ -35,38 +484,77 @@ class TicTacToe:
         - exito: True si el movimiento fue válido
         - casilla_eliminada: índice de la casilla eliminada o None
         """
-        if not self.casilla_disponible(casilla):
+        estado = self._estado
+        if not estado.casilla_disponible(casilla):
             return False, None
         
-        movimientos = self.obtener_movimientos_actuales()
-        casilla_eliminada = None
-        
-        # Si ya tiene 3 fichas, eliminar la más antigua
-        if len(movimientos) >= self.numero_maximo_de_mov:
-            casilla_eliminada = movimientos.pop(0)
-            self.tablero[casilla_eliminada] = ' '
+        # Si ya tiene 3 fichas, colocar elimina la más antigua
+        turno = estado.turno
+        hash_previo = self.hash
+        self.hash = self._hash_tras_colocar(casilla)
+        casilla_eliminada = estado.colocar(casilla, self.numero_maximo_de_mov)
+        if self.historial is not None:
+            self.historial.append((casilla, casilla_eliminada, turno, self.ganador_actual, hash_previo))
+        self.num_movimientos += 1
+        if casilla_eliminada is not None:
             self.ganador_actual = None
         
-        # Hacer el movimiento
-        self.tablero[casilla] = self.jugador_actual
-        movimientos.append(casilla)
+        if self.al_mover is not None:
+            self.al_mover(casilla, casilla_eliminada)
         
         return True, casilla_eliminada
     
+    def _hash_tras_colocar(self, casilla):
+        """Hash tras colocar la casilla para el jugador en turno, en O(max_fichas)"""
+        estado = self._estado
+        claves = self._claves_zobrist[estado.turno]
+        cola, fichas = (estado.cola_x, estado.x) if estado.turno == 0 else (estado.cola_o, estado.o)
+        n = fichas.bit_count()
+        valor = self.hash
+        if n >= self.numero_maximo_de_mov:
+            # Sale la más antigua y cada ficha restante pasa a la edad anterior
+            bits = self.geometria.bits_casilla
+            mascara = self.geometria.mascara_casilla
+            valor ^= claves[0][cola & mascara]
+            for edad in range(1, n):
+                restante = (cola >> (bits * edad)) & mascara
+                valor ^= claves[edad][restante] ^ claves[edad - 1][restante]
+            n -= 1
+        return valor ^ claves[n][casilla]
+    
     def verificar_ganador(self, jugador):
         """
         Verifica si el jugador indicado ha ganado.
         Retorna la combinación ganadora o None.
         """
-        for combo in self.win_combinations:
-            if all(self.tablero[i] == jugador for i in combo):
-                self.ganador_actual = jugador
-                return combo
-        return None
+        # Solo las líneas que pasan por la ficha más reciente del jugador
+        ultima = self._estado.ultima(jugador)
+        if ultima is None:
+            return None
+        combo = self.geometria.linea_por_casilla(self._estado.fichas(jugador), ultima)
+        if combo is not None:
+            self.ganador_actual = jugador
+        return combo
     
     def cambiar_turno(self):
-        """Cambia el turno al siguiente jugador"""
-        self.jugador_actual = 'O' if self.jugador_actual == 'X' else 'X'
+        """Cambia el turno al siguiente jugador y cuenta la posición para las repeticiones"""
+        self._estado.turno ^= 1
+        self.hash ^= self._clave_turno
+        if self.tablas_por_repeticion is not None:
+            self.repeticiones[self.hash] = self.repeticiones.get(self.hash, 0) + 1
+    
+    def verificar_tablas(self):
+        """
+        Retorna 'repeticion' si la posición actual ya apareció tablas_por_repeticion
+        veces, 'limite' si se jugaron limite_movimientos movimientos, o None.
+        Se consulta tras cambiar_turno, como verificar_ganador tras cada jugada.
+        """
+        if (self.tablas_por_repeticion is not None
+                and self.repeticiones.get(self.hash, 0) >= self.tablas_por_repeticion):
+            return 'repeticion'
+        if self.limite_movimientos is not None and self.num_movimientos >= self.limite_movimientos:
+            return 'limite'
+        return None
     
     def obtener_fichas_a_desvanecer(self):
         """
@@ -75,158 +563,600 @@ class TicTacToe:
         """
         fichas_desvanecidas = []
         
-        if len(self.x_moves) >= self.numero_maximo_de_mov:
-            fichas_desvanecidas.append(('X', self.x_moves[0]))
+        if self._estado.x.bit_count() >= self.numero_maximo_de_mov:
+            fichas_desvanecidas.append(('X', self._estado.cola_x & self.geometria.mascara_casilla))
         
-        if len(self.o_moves) >= self.numero_maximo_de_mov:
-            fichas_desvanecidas.append(('O', self.o_moves[0]))
+        if self._estado.o.bit_count() >= self.numero_maximo_de_mov:
+            fichas_desvanecidas.append(('O', self._estado.cola_o & self.geometria.mascara_casilla))
         
         return fichas_desvanecidas
     
+    def deshacer_movimiento(self):
+        """
+        Revierte el último hacer_movimiento en O(1): la ficha, la eliminada, el
+        turno en que se jugó y el ganador. Retorna la casilla o None si no hay
+        (solo se guardan los últimos largo_historial movimientos).
+        """
+        if not self.historial:
+            return None
+        casilla, eliminada, turno, ganador, hash_previo = self.historial.pop()
+        if self._estado.turno != turno and self.hash in self.repeticiones:
+            # El turno ya se había pasado: esa posición deja de contar
+            restantes = self.repeticiones[self.hash] - 1
+            if restantes:
+                self.repeticiones[self.hash] = restantes
+            else:
+                del self.repeticiones[self.hash]
+        self._estado.turno = turno ^ 1  # deshacer espera el turno ya pasado
+        self._estado.deshacer(casilla, eliminada)
+        self.ganador_actual = ganador
+        self.hash = hash_previo
+        self.num_movimientos -= 1
+        return casilla
+    
     def reiniciar(self):
         """Reinicia el juego a su estado inicial"""
-        self.tablero = [' ' for _ in range(9)]
+        self.estado = EstadoBits(geo=self.geometria)
         self.ganador_actual = None
-        self.jugador_actual = 'X'
-        self.x_moves = []
-        self.o_moves = []
     
     def obtener_conteo_fichas(self):
         """Retorna el conteo de fichas de cada jugador"""
-        return len(self.x_moves), len(self.o_moves)
+        return self._estado.x.bit_count(), self._estado.o.bit_count()
     
     def obtener_casillas_disponibles(self):
         """Retorna lista de casillas vacías"""
-        return [i for i, c in enumerate(self.tablero) if c == ' ']
+        return list(self._estado.casillas_disponibles())
     
     def simular_movimiento(self, casilla, jugador):
         """Simula un movimiento sin modificar el estado real. Retorna copia del estado."""
-        moves = self.x_moves[:] if jugador == 'X' else self.o_moves[:]
-        tablero = self.tablero[:]
+        estado = self.simular_estado(casilla, jugador)
+        cola, fichas = (estado.cola_x, estado.x) if jugador == 'X' else (estado.cola_o, estado.o)
+        return estado.tablero(), desempaquetar_cola(cola, fichas.bit_count(), self.geometria.bits_casilla)
+    
+    def simular_estado(self, casilla, jugador):
+        """Como simular_movimiento, pero retorna el EstadoBits resultante"""
+        return self._estado.simular(casilla, jugador, self.numero_maximo_de_mov)
+
+
+class CacheMovimientos:
+    """Caché LRU de tamaño acotado con contadores de aciertos y fallos"""
+    
+    def __init__(self, capacidad=4096):
+        self.capacidad = capacidad
+        self.datos = OrderedDict()
+        self.aciertos = 0
+        self.fallos = 0
+    
+    def obtener(self, clave, contar=True):
+        """Retorna el valor guardado (y lo marca como reciente) o None; contar=False no toca los contadores"""
+        valor = self.datos.get(clave)
+        if valor is None:
+            if contar:
+                self.fallos += 1
+            return None
+        self.datos.move_to_end(clave)
+        if contar:
+            self.aciertos += 1
+        return valor
+    
+    def guardar(self, clave, valor):
+        self.datos[clave] = valor
+        self.datos.move_to_end(clave)
+        if len(self.datos) > self.capacidad:
+            self.datos.popitem(last=False)
+    
+    def limpiar(self):
+        self.datos.clear()
+    
+    def tasa_aciertos(self):
+        consultas = self.aciertos + self.fallos
+        return self.aciertos / consultas if consultas else 0.0
+
+
+# Puntajes y parámetros de la búsqueda
+PUNTAJE_VICTORIA = 1000
+PROFUNDIDAD_DIFICIL = 6   # Profundidad por defecto sin presupuesto en 3x3
+PROFUNDIDAD_DIFICIL_GRANDE = 4   # En tableros mayores hay muchas más jugadas
+PROFUNDIDAD_LIMITE = 64   # Tope de la profundización iterativa con presupuesto
+PROFUNDIDAD_PREDICCION = 4   # Búsqueda corta que prevé la respuesta del rival al ponderar
+NODOS_ENTRE_VERIFICACIONES = 1024   # Tope de nodos entre dos revisiones del presupuesto (potencia de 2)
+NODOS_POR_SEGUNDO = 200_000   # Ritmo aproximado del motor, para repartir las revisiones
+VERIFICACIONES_POR_PRESUPUESTO = 20   # Revisiones mínimas dentro de un tiempo_limite
+SIN_TOPE_NODOS = 1 << 62   # Tope de nodos cuando la búsqueda no tiene limite_nodos
+EXACTA, INFERIOR, SUPERIOR = 0, 1, 2
+PREFERENCIAS = GEOMETRIA_CLASICA.preferencias
+
+
+class BusquedaAgotada(Exception):
+    """Se lanza cuando la búsqueda consume su presupuesto de tiempo o nodos"""
+
+
+class MotorBusqueda:
+    """
+    Búsqueda negamax con poda alfa-beta, profundización iterativa y
+    tabla de transposición indexada por el estado rolling completo.
+    Los puntajes son siempre desde el punto de vista del jugador en turno.
+    """
+    
+    def __init__(self, maximo=3, profundidad_maxima=PROFUNDIDAD_DIFICIL,
+                 tiempo_limite=None, limite_nodos=None, tam_tabla=1 << 20, evaluacion='tabla'):
+        self.maximo = maximo
+        self.profundidad_maxima = profundidad_maxima
+        self.tiempo_limite = tiempo_limite  # Segundos por movimiento
+        self.limite_nodos = limite_nodos
+        self.tam_tabla = tam_tabla
+        self.evaluacion = evaluacion  # 'tabla' (precalculada si el tablero lo permite) o 'lineas'
+        self._evaluaciones = None
+        
+        # La tabla se conserva entre movimientos: la clave es el estado completo
+        self.tabla = {}
+        self.nodos = 0
+        self.profundidad_alcanzada = 0
+        self._fin = None
+        self._tope_nodos = SIN_TOPE_NODOS
+        self._ponderando = False
+        self._mejor_raiz = None
+        self._detenido = False
+        self._mascara_verificacion = NODOS_ENTRE_VERIFICACIONES - 1
+        self.interrumpida = False  # La última búsqueda se cortó antes de terminar su profundidad
+        # threading.Event de la solicitud en curso, si la hay (ver IA.obtener_movimiento).
+        # A diferencia de detener(), buscar no lo limpia: cancelar antes de empezar no se pierde
+        self.cancelacion = None
+    
+    def buscar(self, estado):
+        """
+        Busca la mejor casilla para el jugador en turno del estado.
+        Retorna una tupla (casilla, puntaje).
+        """
+        self._detenido = False
+        self._ponderando = False
+        self._fin = time.perf_counter() + self.tiempo_limite if self.tiempo_limite else None
+        # El tope de nodos se compara en cada nodo: un presupuesto chico se respeta exacto
+        self._tope_nodos = self.limite_nodos if self.limite_nodos is not None else SIN_TOPE_NODOS
+        self._mascara_verificacion = self._intervalo_verificacion(self.tiempo_limite) - 1
+        return self._profundizar(estado, self.profundidad_maxima)
+    
+    def ponderar(self, estado):
+        """
+        Busca mientras piensa el rival (estado con el rival en turno), sin
+        presupuesto, hasta llenar la tabla o hasta detener(). Prevé su respuesta
+        con una búsqueda corta y luego busca la posición resultante: si el rival
+        juega lo previsto, la búsqueda siguiente encuentra el trabajo hecho en la
+        tabla; si no, solo se pierde el tiempo del rival. Retorna la respuesta prevista.
+        """
+        self._detenido = False
+        self._ponderando = True
+        self._fin = None
+        self._tope_nodos = SIN_TOPE_NODOS
+        self._mascara_verificacion = NODOS_ENTRE_VERIFICACIONES - 1
+        prediccion, _ = self._profundizar(estado, min(PROFUNDIDAD_PREDICCION, self.profundidad_maxima))
+        if prediccion is None or self._detenido:
+            return prediccion
         
-        # Simular eliminación de ficha antigua
-        if len(moves) >= self.numero_maximo_de_mov:
-            tablero[moves[0]] = ' '
-            moves = moves[1:]
+        siguiente = estado.copiar()
+        siguiente.mover(prediccion, self.maximo)
+        if not self._hay_ganador(siguiente, estado.turno, prediccion):
+            self._profundizar(siguiente, self.profundidad_maxima)
+        return prediccion
+    
+    def _profundizar(self, estado, profundidad_maxima):
+        """Profundización iterativa con el presupuesto ya fijado por buscar o ponderar"""
+        disponibles = estado.geo.candidatas(estado.x | estado.o)
+        if not disponibles:
+            return None, 0
         
-        tablero[casilla] = jugador
-        moves.append(casilla)
-        return tablero, moves
+        # La búsqueda mueve y deshace sobre su propia copia: una sola por búsqueda
+        estado = estado.copiar()
+        self._evaluaciones = estado.geo.tabla_evaluacion() if self.evaluacion == 'tabla' else None
+        self.nodos = 0
+        self.profundidad_alcanzada = 0
+        self.interrumpida = False
+        if len(self.tabla) > self.tam_tabla:
+            self.tabla.clear()
+        
+        mejor = (self._ordenar(estado.geo, disponibles, None)[0], 0)
+        for profundidad in range(1, profundidad_maxima + 1):
+            try:
+                puntaje = self._negamax(estado, profundidad, -PUNTAJE_VICTORIA - 1, PUNTAJE_VICTORIA + 1, 0)
+            except BusquedaAgotada:
+                # Se conserva el resultado de la última iteración completa
+                self.interrumpida = True
+                break
+            mejor = (self._mejor_raiz, puntaje)
+            self.profundidad_alcanzada = profundidad
+            # Un resultado forzado no cambia con más profundidad
+            if abs(puntaje) > PUNTAJE_VICTORIA - PROFUNDIDAD_LIMITE:
+                break
+        return mejor
+    
+    @staticmethod
+    def _intervalo_verificacion(tiempo_limite):
+        """
+        Nodos entre revisiones del presupuesto, potencia de 2: con un tiempo_limite
+        corto se revisa más seguido para no pasarse de él por un bloque entero de nodos
+        """
+        if not tiempo_limite:
+            return NODOS_ENTRE_VERIFICACIONES
+        nodos = tiempo_limite * NODOS_POR_SEGUNDO / VERIFICACIONES_POR_PRESUPUESTO
+        intervalo = 1
+        while intervalo * 2 <= min(nodos, NODOS_ENTRE_VERIFICACIONES):
+            intervalo *= 2
+        return intervalo
+    
+    def detener(self):
+        """Pide a una búsqueda en curso (en otro hilo) que termine cuanto antes"""
+        self._detenido = True
+    
+    def _verificar_presupuesto(self):
+        if self._detenido or (self.cancelacion is not None and self.cancelacion.is_set()):
+            raise BusquedaAgotada()
+        if self._fin is not None and time.perf_counter() >= self._fin:
+            raise BusquedaAgotada()
+        # Llenar la tabla al ponderar haría que la búsqueda siguiente la vaciara
+        if self._ponderando and len(self.tabla) >= self.tam_tabla:
+            raise BusquedaAgotada()
+    
+    def _ordenar(self, geo, disponibles, primera):
+        """Ordena las jugadas: la de la tabla primero, luego centro, esquinas y lados"""
+        orden = sorted(disponibles, key=geo.rango_preferencia.__getitem__)
+        if primera is not None and primera in orden:
+            orden.remove(primera)
+            orden.insert(0, primera)
+        return orden
+    
+    def _negamax(self, estado, profundidad, alfa, beta, ply):
+        self.nodos += 1
+        if self.nodos >= self._tope_nodos:
+            raise BusquedaAgotada()
+        if not self.nodos & self._mascara_verificacion:
+            self._verificar_presupuesto()
+        
+        clave = estado.clave()
+        entrada = self.tabla.get(clave)
+        casilla_tabla = None
+        if entrada is not None:
+            prof_tabla, puntaje, tipo, casilla_tabla = entrada
+            if ply > 0 and prof_tabla >= profundidad:
+                puntaje = self._desde_tabla(puntaje, ply)
+                if tipo == EXACTA:
+                    return puntaje
+                if tipo == INFERIOR and puntaje >= beta:
+                    return puntaje
+                if tipo == SUPERIOR and puntaje <= alfa:
+                    return puntaje
+        
+        if profundidad == 0:
+            return self._evaluar_tablero(estado)
+        
+        disponibles = estado.geo.candidatas(estado.x | estado.o)
+        if not disponibles:
+            return 0
+        
+        alfa_original = alfa
+        mejor_puntaje = -PUNTAJE_VICTORIA - 1
+        mejor_casilla = None
+        turno = estado.turno
+        for casilla in self._ordenar(estado.geo, disponibles, casilla_tabla):
+            eliminada = estado.mover(casilla, self.maximo)
+            if self._hay_ganador(estado, turno, casilla):
+                puntaje = PUNTAJE_VICTORIA - ply - 1
+            else:
+                puntaje = -self._negamax(estado, profundidad - 1, -beta, -alfa, ply + 1)
+            estado.deshacer(casilla, eliminada)
+            
+            if puntaje > mejor_puntaje:
+                mejor_puntaje = puntaje
+                mejor_casilla = casilla
+                if puntaje > alfa:
+                    alfa = puntaje
+                    if alfa >= beta:
+                        break
+        
+        if mejor_puntaje <= alfa_original:
+            tipo = SUPERIOR
+        elif mejor_puntaje >= beta:
+            tipo = INFERIOR
+        else:
+            tipo = EXACTA
+        self.tabla[clave] = (profundidad, self._hacia_tabla(mejor_puntaje, ply), tipo, mejor_casilla)
+        
+        if ply == 0:
+            self._mejor_raiz = mejor_casilla
+        return mejor_puntaje
+    
+    def _hacia_tabla(self, puntaje, ply):
+        """Guarda las victorias como distancia desde el nodo, no desde la raíz"""
+        if puntaje > PUNTAJE_VICTORIA - PROFUNDIDAD_LIMITE:
+            return puntaje + ply
+        if puntaje < PROFUNDIDAD_LIMITE - PUNTAJE_VICTORIA:
+            return puntaje - ply
+        return puntaje
+    
+    def _desde_tabla(self, puntaje, ply):
+        if puntaje > PUNTAJE_VICTORIA - PROFUNDIDAD_LIMITE:
+            return puntaje - ply
+        if puntaje < PROFUNDIDAD_LIMITE - PUNTAJE_VICTORIA:
+            return puntaje + ply
+        return puntaje
+    
+    def _hay_ganador(self, estado, turno, casilla):
+        """Verifica si la jugada de turno (0 = X, 1 = O) en la casilla completó una línea"""
+        return estado.geo.gana_con(estado.o if turno else estado.x, casilla)
+    
+    def _evaluar_tablero(self, estado):
+        """Evalúa la posición desde el punto de vista del jugador en turno"""
+        tabla = self._evaluaciones
+        if tabla is not None:
+            # Un solo acceso; la evaluación es antisimétrica, así que O la niega
+            valor = tabla[estado.x | estado.o << estado.geo.num_casillas]
+            return -valor if estado.turno else valor
+        if estado.turno:
+            return estado.geo.evaluar_lineas(estado.o, estado.x)
+        return estado.geo.evaluar_lineas(estado.x, estado.o)
+
+
+# Dificultades que consultan una tabla del tablero clásico, y la que juega en su lugar sin ella
+RESPALDOS = {'perfecto': 'dificil', 'aprendida': 'medio'}
+
+
+def tabla_de_dificultad(dificultad, tamano=3, en_linea=3, max_fichas=3):
+    """
+    Retorna la tabla que usa la dificultad con estas reglas (tablebase de
+    'perfecto' o política de 'aprendida'), o None si no existe o no aplica:
+    en ese caso la IA juega RESPALDOS[dificultad].
+    """
+    if dificultad not in RESPALDOS or (tamano, en_linea) != (3, 3):
+        return None
+    # Importación diferida: las tablas son opcionales y dependen de este módulo
+    if dificultad == 'perfecto':
+        import tablebase as modulo
+    else:
+        import politica as modulo
+    return modulo.cargar() if max_fichas == modulo.MAXIMO_FICHAS else None
 
 
 class IA:
     """Inteligencia Artificial para el juego Tic Tac Toe Rolling"""
     
-    def __init__(self, juego, simbolo='O', dificultad='medio'):
+    def __init__(self, juego, simbolo='O', dificultad='medio',
+                 profundidad=None, tiempo_limite=None, limite_nodos=None, tam_cache=4096,
+                 telemetria=None, procesos=None, evaluacion='tabla'):
         self.juego = juego
         self.simbolo = simbolo
         self.oponente = 'X' if simbolo == 'O' else 'O'
         self.dificultad = dificultad
+        
+        # Motor de búsqueda para 'dificil'; con presupuesto se profundiza hasta agotarlo
+        if profundidad is None:
+            if tiempo_limite is not None or limite_nodos is not None:
+                profundidad = PROFUNDIDAD_LIMITE
+            elif juego.tamano > 3:
+                profundidad = PROFUNDIDAD_DIFICIL_GRANDE
+            else:
+                profundidad = PROFUNDIDAD_DIFICIL
+        motor = MotorBusqueda
+        if telemetria is not None:
+            # Importación diferida: el motor instrumentado solo existe si se pide
+            from perfilado import MotorInstrumentado as motor
+        self.motor = motor(juego.numero_maximo_de_mov, profundidad, tiempo_limite, limite_nodos,
+                           evaluacion=evaluacion)
+        self.telemetria = telemetria  # perfilado.Telemetria o None
+        if dificultad == 'dificil' and evaluacion == 'tabla':
+            # La tabla de evaluación se construye aquí y no dentro del presupuesto de la primera jugada
+            juego.geometria.tabla_evaluacion()
+        
+        # Jugadas ya elegidas por posición canónica (módulo simetrías); 0 la desactiva.
+        # _exactas las repite por hash de Zobrist de la posición exacta, sin contadores
+        # propios: cada jugada cuenta una sola consulta en self.cache
+        self.cache = CacheMovimientos(tam_cache) if tam_cache else None
+        self._exactas = CacheMovimientos(tam_cache) if tam_cache else None
+        
+        # Búsqueda de 'mcts', creada al primer uso; procesos=None usa todos los núcleos
+        self.tiempo_limite = tiempo_limite
+        self.limite_nodos = limite_nodos
+        self.procesos = procesos
+        self._mcts = None
+        
+        # Una sola búsqueda a la vez usa el motor: la jugada, la ponderación o una
+        # búsqueda cancelada que todavía no terminó
+        self._busqueda = threading.Lock()
+        self._cancelacion = None
+        self._completa = True  # La búsqueda de la jugada en curso terminó (ver _obtener_movimiento)
+        
+        # Hilo que busca para 'dificil' mientras juega el rival (ver ponderar)
+        self._ponderacion = None
+        self.prediccion = None  # Respuesta del rival que esperaba la última ponderación
     
-    def obtener_movimiento(self):
-        """Retorna la mejor casilla para jugar según la dificultad"""
+    def obtener_movimiento(self, cancelacion=None):
+        """
+        Retorna la mejor casilla para jugar según la dificultad. cancelacion es
+        un threading.Event opcional de esta solicitud: activarlo, incluso antes de
+        que la búsqueda empiece, la corta y el resultado deja de importar.
+        """
+        self.detener_ponderacion()
+        with self._busqueda:
+            if cancelacion is not None and cancelacion.is_set():
+                return None
+            self._cancelacion = cancelacion
+            try:
+                if self.telemetria is not None:
+                    return self.telemetria.medir(self, self._obtener_movimiento)
+                return self._obtener_movimiento()
+            finally:
+                self._cancelacion = None
+    
+    def _obtener_movimiento(self):
         disponibles = self.juego.obtener_casillas_disponibles()
         
         if not disponibles:
             return None
         
+        # La jugada al azar no se guarda: repetirla la volvería siempre la misma
+        if self.cache is None or self.dificultad == 'facil':
+            return self._elegir(disponibles)
+        
+        # Primero la posición exacta por su hash de Zobrist, sin calcular la forma
+        # canónica; se verifica la casilla por si dos estados comparten hash
+        turno = 0 if self.simbolo == 'X' else 1
+        exacta = None
+        if self.juego.estado.turno == turno:
+            exacta = (self.dificultad, self.juego.hash)
+            casilla = self._exactas.obtener(exacta, contar=False)
+            if casilla is not None and self.juego.casilla_disponible(casilla):
+                self.cache.aciertos += 1
+                return casilla
+        
+        estado = self.juego.estado.copiar()
+        estado.turno = turno
+        canonica, simetria = estado.canonica()
+        clave = (self.dificultad, canonica)
+        geo = self.juego.geometria
+        
+        casilla = self.cache.obtener(clave)
+        if casilla is not None:
+            # La jugada guardada está en la orientación canónica
+            casilla = geo.inversas[simetria][casilla]
+        else:
+            self._completa = True
+            casilla = self._elegir(disponibles)
+            if casilla is None:
+                return None
+            # Una búsqueda cortada (cancelada o sin presupuesto) no se guarda: la
+            # próxima vez la misma posición se vuelve a buscar
+            if not self._completa or (self._cancelacion is not None and self._cancelacion.is_set()):
+                return casilla
+            self.cache.guardar(clave, geo.simetrias[simetria][casilla])
+        if exacta is not None:
+            self._exactas.guardar(exacta, casilla)
+        return casilla
+    
+    def _elegir(self, disponibles):
+        """Calcula la jugada según la dificultad, sin caché"""
         if self.dificultad == 'facil':
             return self._movimiento_aleatorio(disponibles)
         elif self.dificultad == 'medio':
             return self._movimiento_medio(disponibles)
+        elif self.dificultad == 'perfecto':
+            return self._movimiento_perfecto(disponibles)
+        elif self.dificultad == 'mcts':
+            return self._movimiento_mcts(disponibles)
+        elif self.dificultad == 'aprendida':
+            return self._movimiento_aprendido(disponibles)
         else:  # dificil
             return self._movimiento_dificil(disponibles)
     
+    def cancelar(self):
+        """Interrumpe la búsqueda en curso si la hay; su resultado ya no importa"""
+        self.motor.detener()
+        if self._mcts is not None:
+            self._mcts.detener()
+        self.detener_ponderacion()
+    
+    def ponderar(self):
+        """
+        Empieza a buscar en un hilo mientras piensa el rival. La próxima jugada
+        de 'dificil' reutiliza lo que quedó en la tabla del motor. Retorna False
+        si no hay nada que ponderar (otra dificultad o no es turno del rival).
+        """
+        self.detener_ponderacion()
+        if self.dificultad != 'dificil' or self.juego.jugador_actual != self.oponente:
+            return False
+        estado = self.juego.estado.copiar()
+        self._ponderacion = threading.Thread(target=self._ponderar, args=(estado,), daemon=True)
+        self._ponderacion.start()
+        return True
+    
+    def _ponderar(self, estado):
+        with self._busqueda:
+            self.motor.cancelacion = None
+            self.prediccion = self.motor.ponderar(estado)
+    
+    def detener_ponderacion(self):
+        """Corta la ponderación en curso y espera a su hilo; lo ya buscado queda en la tabla"""
+        hilo = self._ponderacion
+        if hilo is None:
+            return
+        # Se insiste hasta que termine: el hilo pudo no haber empezado a buscar todavía
+        while hilo.is_alive():
+            self.motor.detener()
+            hilo.join(0.01)
+        self._ponderacion = None
+    
     def _movimiento_aleatorio(self, disponibles):
         """Elige una casilla al azar"""
         return random.choice(disponibles)
     
     def _movimiento_medio(self, disponibles):
         """Intenta ganar o bloquear, sino elige estratégicamente"""
-        # 1. Intentar ganar
-        for casilla in disponibles:
-            tablero, _ = self.juego.simular_movimiento(casilla, self.simbolo)
-            if self._hay_ganador(tablero, self.simbolo):
-                return casilla
+        # Una sola copia: cada prueba se juega y se deshace sobre ella
+        estado = self.juego.estado.copiar()
+        maximo = self.juego.numero_maximo_de_mov
         
-        # 2. Bloquear al oponente
-        for casilla in disponibles:
-            tablero, _ = self.juego.simular_movimiento(casilla, self.oponente)
-            if self._hay_ganador(tablero, self.oponente):
-                return casilla
+        # 1. Intentar ganar, 2. bloquear al oponente
+        for jugador in (self.simbolo, self.oponente):
+            for casilla in disponibles:
+                estado.turno = 0 if jugador == 'X' else 1
+                eliminada = estado.mover(casilla, maximo)
+                gana = self._hay_ganador(estado, jugador, casilla)
+                estado.deshacer(casilla, eliminada)
+                if gana:
+                    return casilla
         
         # 3. Preferir centro, luego esquinas
-        preferencias = [4, 0, 2, 6, 8, 1, 3, 5, 7]
-        for casilla in preferencias:
+        for casilla in self.juego.geometria.preferencias:
             if casilla in disponibles:
                 return casilla
         
         return disponibles[0]
     
     def _movimiento_dificil(self, disponibles):
-        """Usa minimax simplificado para el modo rolling"""
-        mejor_puntaje = -float('inf')
-        mejor_casilla = disponibles[0]
-        
-        for casilla in disponibles:
-            puntaje = self._minimax(casilla, self.simbolo, 0, False)
-            if puntaje > mejor_puntaje:
-                mejor_puntaje = puntaje
-                mejor_casilla = casilla
-        
-        return mejor_casilla
+        """Busca con alfa-beta desde el estado real del juego"""
+        estado = self.juego.estado.copiar()
+        estado.turno = 0 if self.simbolo == 'X' else 1
+        self.motor.cancelacion = self._cancelacion
+        casilla, _ = self.motor.buscar(estado)
+        self._completa = not self.motor.interrumpida
+        return casilla if casilla is not None else disponibles[0]
     
-    def _minimax(self, casilla, jugador, profundidad, es_maximizando):
-        
-        tablero, _ = self.juego.simular_movimiento(casilla, jugador)
-        # Verificar estados terminales
-        if self._hay_ganador(tablero, self.simbolo):
-            return 10 - profundidad
-        if self._hay_ganador(tablero, self.oponente):
-            return profundidad - 10
-        
-        # Limitar profundidad para el modo rolling
-        if profundidad >= 3:
-            return self._evaluar_tablero(tablero)
-        
-        disponibles = [i for i, c in enumerate(tablero) if c == ' ']
-        if not disponibles:
-            return 0
-        
-        if es_maximizando:
-            mejor = -float('inf')
-            for c in disponibles:
-                puntaje = self._minimax(c, self.simbolo, profundidad + 1, False)
-                mejor = max(mejor, puntaje)
-            return mejor
-        else:
-            mejor = float('inf')
-            for c in disponibles:
-                puntaje = self._minimax(c, self.oponente, profundidad + 1, True)
-                mejor = min(mejor, puntaje)
-            return mejor
-    
-    def _hay_ganador(self, tablero, jugador):
-        """Verifica si hay ganador en un tablero dado"""
-        for combo in self.juego.win_combinations:
-            if all(tablero[i] == jugador for i in combo):
-                return True
-        return False
+    def _movimiento_mcts(self, disponibles):
+        """Búsqueda Monte Carlo en árbol, repartida en procesos, con presupuesto de tiempo"""
+        # Importación diferida: mcts depende de este módulo
+        import mcts
+        if self._mcts is None:
+            self._mcts = mcts.BusquedaMCTS(
+                self.juego.numero_maximo_de_mov, self.tiempo_limite or mcts.TIEMPO_POR_DEFECTO,
+                self.limite_nodos, procesos=self.procesos)
+        estado = self.juego.estado.copiar()
+        estado.turno = 0 if self.simbolo == 'X' else 1
+        self._mcts.cancelacion = self._cancelacion
+        casilla = self._mcts.buscar(estado)
+        self._completa = not self._mcts.interrumpida
+        return casilla if casilla is not None else disponibles[0]
     
-    def _evaluar_tablero(self, tablero):
-        """Evalúa posición del tablero"""
-        puntaje = 0
-        for combo in self.juego.win_combinations:
-            mis_fichas = sum(1 for i in combo if tablero[i] == self.simbolo)
-            fichas_oponente = sum(1 for i in combo if tablero[i] == self.oponente)
-            
-            if fichas_oponente == 0:
-                puntaje += mis_fichas
-            if mis_fichas == 0:
-                puntaje -= fichas_oponente
+    def _tabla(self):
+        juego = self.juego
+        return tabla_de_dificultad(self.dificultad, juego.tamano, juego.en_linea, juego.numero_maximo_de_mov)
+    
+    def _movimiento_perfecto(self, disponibles):
+        """Consulta la tabla precalculada; sin tabla usa la búsqueda de 'dificil'"""
+        tabla = self._tabla()
+        if tabla is None:
+            return self._movimiento_dificil(disponibles)
         
-        # Bonus por centro
-        if tablero[4] == self.simbolo:
-            puntaje += 2
+        estado = self.juego.estado.copiar()
+        estado.turno = 0 if self.simbolo == 'X' else 1
+        return tabla.mejor_movimiento(estado)
+    
+    def _movimiento_aprendido(self, disponibles):
+        """Consulta la tabla entrenada por autojuego (entrenamiento.py); sin tabla juega como 'medio'"""
+        tabla = self._tabla()
+        if tabla is None:
+            return self._movimiento_medio(disponibles)
         
-        return puntaje
+        estado = self.juego.estado.copiar()
+        estado.turno = 0 if self.simbolo == 'X' else 1
+        return tabla.mejor_movimiento(estado)
+    
+    def _hay_ganador(self, estado, jugador, casilla):
+        """Verifica si la ficha del jugador en la casilla completó una línea"""
+        return self.juego.geometria.gana_con(estado.fichas(jugador), casilla)
@@ -0,0 +1,200 @@
+# Benchmarks de las rutas críticas del backend y de la latencia de la IA
+# Uso: python benchmarks.py --salida actual.json [--comparar base.json]
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+
+from backend import TicTacToe, IA
+
+SEMILLA_CORPUS = 2024
+TAM_CORPUS = 300
+DIFICULTADES = ['facil', 'medio', 'dificil', 'perfecto', 'mcts', 'aprendida']
+# 'mcts' se mide con un número fijo de iteraciones en un solo proceso: con su
+# presupuesto de tiempo por defecto la latencia sería ese tiempo y no su costo
+OPCIONES_IA = {'mcts': {'limite_nodos': 200, 'procesos': 1}}
+TOLERANCIA = 0.10  # Aumento relativo de p50 que se considera regresión
+
+# Arranque en un proceso nuevo, hasta la primera jugada cuando corresponde
+ARRANQUE = {
+    'python_vacio': ['-c', 'pass'],
+    'importar_backend': ['-c', 'import backend'],
+    'importar_front': ['-c', 'import front'],  # Incluye tkinter
+    'consola_primera_jugada': ['consola.py', 'analizar', '--dificultad', 'medio'],
+}
+
+
+def generar_corpus(cantidad=TAM_CORPUS, semilla=SEMILLA_CORPUS):
+    """
+    Genera un corpus fijo de posiciones sin ganador jugando al azar con semilla.
+    Retorna una lista de EstadoBits.
+    """
+    rng = random.Random(semilla)
+    corpus = []
+    while len(corpus) < cantidad:
+        juego = TicTacToe()
+        for _ in range(rng.randrange(0, 16)):
+            juego.hacer_movimiento(rng.choice(juego.obtener_casillas_disponibles()))
+            if juego.verificar_ganador(juego.jugador_actual):
+                break
+            juego.cambiar_turno()
+        else:
+            corpus.append(juego.estado.copiar())
+    return corpus
+
+
+def percentil(ordenados, p):
+    indice = min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))
+    return ordenados[indice]
+
+
+def medir(operacion, corpus, repeticiones):
+    """
+    Mide `operacion(juego)` sobre cada posición del corpus.
+    La preparación del juego queda fuera de la medición.
+    Retorna un dict con llamadas por segundo y percentiles en microsegundos.
+    """
+    juego = TicTacToe()
+    tiempos = []
+    for _ in range(repeticiones):
+        for estado in corpus:
+            juego.estado = estado.copiar()
+            juego.ganador_actual = None
+            preparada = operacion(juego)
+            inicio = time.perf_counter_ns()
+            preparada()
+            tiempos.append(time.perf_counter_ns() - inicio)
+    tiempos.sort()
+    total = sum(tiempos)
+    return {
+        'llamadas': len(tiempos),
+        'por_segundo': len(tiempos) / (total / 1e9) if total else float('inf'),
+        'p50_us': percentil(tiempos, 50) / 1000,
+        'p95_us': percentil(tiempos, 95) / 1000,
+        'p99_us': percentil(tiempos, 99) / 1000,
+    }
+
+
+def _primera_libre(juego):
+    return juego.obtener_casillas_disponibles()[0]
+
+
+def operaciones():
+    """Cada operación recibe el juego preparado y retorna la llamada a medir"""
+    ops = {
+        'hacer_movimiento': lambda j: (lambda c=_primera_libre(j): j.hacer_movimiento(c)),
+        'simular_movimiento': lambda j: (lambda c=_primera_libre(j): j.simular_movimiento(c, j.jugador_actual)),
+        'verificar_ganador': lambda j: (lambda: j.verificar_ganador(j.jugador_actual)),
+        'obtener_fichas_a_desvanecer': lambda j: j.obtener_fichas_a_desvanecer,
+    }
+    for dificultad in DIFICULTADES:
+        # Una IA nueva por llamada: la tabla de transposición arranca vacía
+        ops[f'ia_{dificultad}'] = (
+            lambda j, d=dificultad: IA(j, j.jugador_actual, d, **OPCIONES_IA.get(d, {})).obtener_movimiento)
+    return ops
+
+
+def ejecutar(repeticiones_backend=20, repeticiones_ia=1, filtro=None):
+    corpus = generar_corpus()
+    random.seed(SEMILLA_CORPUS)  # La IA 'facil' usa el generador global
+    resultados = {}
+    for nombre, operacion in operaciones().items():
+        if filtro and filtro not in nombre:
+            continue
+        repeticiones = repeticiones_ia if nombre.startswith('ia_') else repeticiones_backend
+        resultados[nombre] = medir(operacion, corpus, repeticiones)
+    return {
+        'entorno': {
+            'python': platform.python_version(),
+            'implementacion': platform.python_implementation(),
+            'plataforma': platform.platform(),
+            'corpus': {'semilla': SEMILLA_CORPUS, 'posiciones': len(corpus)},
+        },
+        'resultados': resultados,
+    }
+
+
+def medir_arranque(repeticiones=10):
+    """
+    Mide en milisegundos de reloj cada comando de ARRANQUE en un intérprete
+    nuevo. Un comando que falla (por ejemplo sin tkinter) queda en None.
+    """
+    directorio = os.path.dirname(os.path.abspath(__file__))
+    resultados = {}
+    for nombre, argumentos in ARRANQUE.items():
+        tiempos = []
+        for _ in range(repeticiones):
+            inicio = time.perf_counter()
+            proceso = subprocess.run([sys.executable, *argumentos], cwd=directorio,
+                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            if proceso.returncode != 0:
+                break
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+        else:
+            tiempos.sort()
+            resultados[nombre] = {'p50_ms': percentil(tiempos, 50), 'min_ms': tiempos[0]}
+            continue
+        resultados[nombre] = None
+    return resultados
+
+
+def comparar(base, actual, tolerancia=TOLERANCIA):
+    """Retorna la lista de operaciones cuyo p50 empeoró más que la tolerancia"""
+    regresiones = []
+    for nombre, datos in actual['resultados'].items():
+        anterior = base['resultados'].get(nombre)
+        if anterior is None or not anterior['p50_us']:
+            continue
+        cambio = datos['p50_us'] / anterior['p50_us'] - 1
+        if cambio > tolerancia:
+            regresiones.append((nombre, anterior['p50_us'], datos['p50_us'], cambio))
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de Tic Tac Toe Rolling")
+    parser.add_argument('--salida', help="Archivo JSON donde guardar los resultados")
+    parser.add_argument('--comparar', help="Resultados anteriores (JSON) para detectar regresiones")
+    parser.add_argument('--tolerancia', type=float, default=TOLERANCIA)
+    parser.add_argument('--repeticiones', type=int, default=20, help="Pasadas del corpus para el backend")
+    parser.add_argument('--repeticiones-ia', type=int, default=1, help="Pasadas del corpus para la IA")
+    parser.add_argument('--filtro', help="Solo operaciones cuyo nombre contiene este texto")
+    parser.add_argument('--arranque', type=int, default=0, metavar='N',
+                        help="Medir también el tiempo de arranque con N procesos por comando")
+    args = parser.parse_args(argv)
+
+    informe = ejecutar(args.repeticiones, args.repeticiones_ia, args.filtro)
+    print(f"{'operación':<30}{'llamadas/s':>14}{'p50 µs':>10}{'p95 µs':>10}{'p99 µs':>10}")
+    for nombre, datos in informe['resultados'].items():
+        print(f"{nombre:<30}{datos['por_segundo']:>14,.0f}{datos['p50_us']:>10.2f}"
+              f"{datos['p95_us']:>10.2f}{datos['p99_us']:>10.2f}")
+
+    if args.arranque:
+        informe['arranque'] = medir_arranque(args.arranque)
+        print(f"\n{'arranque':<30}{'p50 ms':>10}{'mín ms':>10}")
+        for nombre, datos in informe['arranque'].items():
+            if datos is None:
+                print(f"{nombre:<30}{'falló':>10}")
+            else:
+                print(f"{nombre:<30}{datos['p50_ms']:>10.1f}{datos['min_ms']:>10.1f}")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, indent=2)
+
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as f:
+            base = json.load(f)
+        regresiones = comparar(base, informe, args.tolerancia)
+        for nombre, antes, despues, cambio in regresiones:
+            print(f"REGRESIÓN {nombre}: p50 {antes:.2f} -> {despues:.2f} µs (+{cambio:.0%})")
+        if regresiones:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+# Generador de carga para servidor.py
+# Abre varias conexiones y juega partidas al azar contra la IA del servidor,
+# midiendo la latencia de cada petición.
+import argparse
+import asyncio
+import json
+import random
+import time
+
+LIMITE_MOVIMIENTOS = 100
+
+
+class Cliente:
+    """Conexión JSON por líneas; las peticiones de una conexión se responden en orden"""
+
+    def __init__(self, lector, escritor):
+        self.lector = lector
+        self.escritor = escritor
+
+    @classmethod
+    async def conectar(cls, host, puerto):
+        lector, escritor = await asyncio.open_connection(host, puerto)
+        return cls(lector, escritor)
+
+    async def pedir(self, **peticion):
+        self.escritor.write(json.dumps(peticion).encode() + b'\n')
+        await self.escritor.drain()
+        respuesta = json.loads(await self.lector.readline())
+        if not respuesta['ok']:
+            raise RuntimeError(respuesta['error'])
+        return respuesta
+
+    async def cerrar(self):
+        self.escritor.close()
+        await self.escritor.wait_closed()
+
+
+async def jugar_partidas(cliente, partidas, dificultad, latencias, rng):
+    """Juega partidas completas eligiendo casillas vacías al azar"""
+    for _ in range(partidas):
+        respuesta = await cliente.pedir(op='nueva', modo='vs_computadora', dificultad=dificultad)
+        sesion = respuesta['sesion']
+        estado = respuesta['estado']
+        for _ in range(LIMITE_MOVIMIENTOS):
+            if estado['ganador'] or estado['tablas']:
+                break
+            libres = [i for i, c in enumerate(estado['tablero']) if c == ' ']
+            inicio = time.perf_counter()
+            respuesta = await cliente.pedir(op='mover', sesion=sesion, casilla=rng.choice(libres))
+            latencias.append(time.perf_counter() - inicio)
+            estado = respuesta['estado']
+        await cliente.pedir(op='cerrar', sesion=sesion)
+
+
+async def ejecutar(host, puerto, conexiones, partidas, dificultad, semilla):
+    clientes = [await Cliente.conectar(host, puerto) for _ in range(conexiones)]
+    latencias = []
+    inicio = time.perf_counter()
+    await asyncio.gather(*(
+        jugar_partidas(cliente, partidas, dificultad, latencias, random.Random(semilla + i))
+        for i, cliente in enumerate(clientes)))
+    duracion = time.perf_counter() - inicio
+
+    stats = (await clientes[0].pedir(op='stats'))['stats']
+    for cliente in clientes:
+        await cliente.cerrar()
+
+    latencias.sort()
+    n = len(latencias)
+    print(f"{conexiones * partidas} partidas, {n} jugadas en {duracion:.2f} s ({n / duracion:,.0f} jugadas/s)")
+    for p in (50, 95, 99):
+        print(f"  p{p}: {latencias[min(n - 1, int(p / 100 * n))] * 1000:.2f} ms")
+    print(f"Servidor: {json.dumps(stats)}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generador de carga para servidor.py")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--conexiones', type=int, default=50)
+    parser.add_argument('--partidas', type=int, default=10, help="Partidas por conexión")
+    parser.add_argument('--dificultad', default='medio')
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args(argv)
+    asyncio.run(ejecutar(args.host, args.puerto, args.conexiones, args.partidas,
+                         args.dificultad, args.semilla))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,194 @@
+# Línea de comandos de Tic Tac Toe Rolling, sin interfaz gráfica
+# Nunca importa tkinter: sirve en servidores y procesos por lotes sin pantalla.
+# Cada subcomando importa solo lo que usa, para que la primera jugada llegue rápido.
+#
+#   python consola.py jugar [--dificultad dificil] [--humano O] [--tamano 5 --en-linea 4 --max-fichas 4]
+#   python consola.py analizar 5,1,9 [--dificultad medio dificil]
+#   python consola.py partidas medio dificil [--cantidad 100]
+import argparse
+import sys
+import time
+
+RESULTADOS = {0: 'tablas', 1: 'gana', 2: 'pierde'}
+MOTIVOS_TABLAS = {'repeticion': "posición repetida", 'limite': "límite de movimientos"}
+
+
+def _crear_juego(args):
+    from backend import TicTacToe
+    return TicTacToe(args.tamano, args.en_linea, args.max_fichas)
+
+
+def dibujar(juego):
+    """Retorna el tablero como texto: casillas libres numeradas desde 1, la próxima en desaparecer en minúscula"""
+    n = juego.tamano
+    ancho = len(str(n * n))
+    desvanecen = {casilla for _, casilla in juego.obtener_fichas_a_desvanecer()}
+    celdas = []
+    for i, valor in enumerate(juego.tablero):
+        if valor == ' ':
+            texto = str(i + 1)
+        else:
+            texto = valor.lower() if i in desvanecen else valor
+        celdas.append(texto.rjust(ancho))
+    filas = [' | '.join(celdas[f * n:(f + 1) * n]) for f in range(n)]
+    return ('\n' + '-' * len(filas[0]) + '\n').join(filas)
+
+
+def _leer_casilla(juego, texto):
+    """Retorna la casilla (desde 0) escrita como número de 1 a N, o None si no existe en el tablero"""
+    texto = texto.strip()
+    if not texto.isdigit() or not 1 <= int(texto) <= juego.geometria.num_casillas:
+        return None
+    return int(texto) - 1
+
+
+def _pedir_casilla(juego, entrada=input):
+    """Pide una casilla libre; retorna None si se quiere salir (q, fin de entrada o Ctrl-C)"""
+    num_casillas = juego.geometria.num_casillas
+    while True:
+        try:
+            texto = entrada(f"Casilla para {juego.jugador_actual} (1-{num_casillas}, q para salir): ")
+        except (EOFError, KeyboardInterrupt):
+            print()
+            return None
+        if texto.strip().lower() in ('q', 'salir'):
+            return None
+        casilla = _leer_casilla(juego, texto)
+        if casilla is not None and juego.casilla_disponible(casilla):
+            return casilla
+        print("Casilla no disponible")
+
+
+def jugar(args):
+    """Partida en la terminal contra la IA o entre dos personas"""
+    from backend import IA
+
+    juego = _crear_juego(args)
+    juego.tablas_por_repeticion = args.repeticiones or None
+    juego.limite_movimientos = args.limite
+    ia = None
+    if args.dificultad:
+        ia = IA(juego, 'O' if args.humano == 'X' else 'X', args.dificultad, tiempo_limite=args.tiempo_limite)
+
+    while True:
+        print(dibujar(juego) + '\n')
+        if ia is not None and juego.jugador_actual == ia.simbolo:
+            casilla = ia.obtener_movimiento()
+            print(f"{ia.simbolo} juega {casilla + 1}")
+        else:
+            if ia is not None:
+                # La IA busca mientras se espera la jugada
+                ia.ponderar()
+            casilla = _pedir_casilla(juego)
+            if casilla is None:
+                return
+        juego.hacer_movimiento(casilla)
+        if juego.verificar_ganador(juego.jugador_actual):
+            print(dibujar(juego))
+            print(f"\n¡{juego.jugador_actual} gana!")
+            return
+        juego.cambiar_turno()
+        tablas = juego.verificar_tablas()
+        if tablas:
+            print(dibujar(juego))
+            print(f"\nTablas por {MOTIVOS_TABLAS[tablas]}")
+            return
+
+
+def analizar(args):
+    """Muestra la jugada de cada dificultad (y el valor exacto si hay tabla) para una posición"""
+    from backend import IA, RESPALDOS, tabla_de_dificultad
+
+    juego = _crear_juego(args)
+    textos = [c for c in args.movimientos.split(',') if c.strip()] if args.movimientos else []
+    for texto in textos:
+        casilla = _leer_casilla(juego, texto)
+        if casilla is None or not juego.casilla_disponible(casilla):
+            sys.exit(f"Casilla no disponible: {texto.strip()}")
+        juego.hacer_movimiento(casilla)
+        if juego.verificar_ganador(juego.jugador_actual):
+            sys.exit(f"{juego.jugador_actual} ya ganó en esta posición")
+        juego.cambiar_turno()
+
+    print(dibujar(juego))
+    print(f"\nJuega {juego.jugador_actual}")
+
+    if args.max_fichas == 3 and args.tamano == 3 and args.en_linea == 3:
+        # Importación diferida: la tabla solo existe para el tablero clásico
+        import tablebase
+        tabla = tablebase.cargar()
+        if tabla is not None:
+            resultado, distancia = tabla.consultar(juego.estado)
+            detalle = f" en {distancia} jugadas" if resultado != tablebase.TABLAS else ""
+            print(f"Tabla: {juego.jugador_actual} {RESULTADOS[resultado]}{detalle}")
+
+    for dificultad in args.dificultad:
+        ia = IA(juego, juego.jugador_actual, dificultad, tiempo_limite=args.tiempo_limite)
+        inicio = time.perf_counter()
+        casilla = ia.obtener_movimiento()
+        duracion = (time.perf_counter() - inicio) * 1000
+        nota = ""
+        if dificultad in RESPALDOS and tabla_de_dificultad(dificultad, args.tamano, args.en_linea,
+                                                            args.max_fichas) is None:
+            nota = f"  sin tabla: juega como '{RESPALDOS[dificultad]}'"
+        print(f"{dificultad:<10} {casilla + 1} ({duracion:.1f} ms){nota}")
+
+
+def partidas(args):
+    """Partidas IA contra IA en este proceso, con el formato de jugadores de autojuego"""
+    from autojuego import jugar_partida, Estadisticas
+
+    estadisticas = Estadisticas()
+    inicio = time.perf_counter()
+    for i in range(args.cantidad):
+        estadisticas.agregar(jugar_partida(args.x, args.o, args.semilla + i, args.limite,
+                                           args.repeticiones or None))
+    duracion = time.perf_counter() - inicio
+    for clave, datos in estadisticas.resumen().items():
+        print(f"{clave}: X {datos['X']}  O {datos['O']}  tablas {datos['tablas']} "
+              f"({datos['repeticiones']} por repetición)  "
+              f"largo promedio {datos['largo_promedio']:.1f}  ({duracion:.2f} s)")
+
+
+def crear_parser():
+    parser = argparse.ArgumentParser(description="Tic Tac Toe Rolling en la terminal")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    reglas = argparse.ArgumentParser(add_help=False)
+    reglas.add_argument('--tamano', type=int, default=3)
+    reglas.add_argument('--en-linea', type=int, default=3)
+    reglas.add_argument('--max-fichas', type=int, default=3)
+    reglas.add_argument('--tiempo-limite', type=float, help="Segundos por jugada para 'dificil'")
+
+    p = subparsers.add_parser('jugar', parents=[reglas], help="Jugar en la terminal")
+    p.add_argument('--dificultad', default='medio', help="Dificultad de la IA; vacío para 1 vs 1")
+    p.add_argument('--humano', choices=('X', 'O'), default='X')
+    p.add_argument('--limite', type=int, default=200, help="Movimientos antes de declarar tablas")
+    p.add_argument('--repeticiones', type=int, default=3,
+                   help="Tablas cuando una posición aparece tantas veces (0 no lo revisa)")
+    p.set_defaults(funcion=jugar)
+
+    p = subparsers.add_parser('analizar', parents=[reglas], help="Analizar una posición")
+    p.add_argument('movimientos', nargs='?', default='',
+                   help="Casillas jugadas desde el inicio (1 a N), separadas por comas")
+    p.add_argument('--dificultad', nargs='+', default=['medio', 'dificil', 'perfecto'])
+    p.set_defaults(funcion=analizar)
+
+    p = subparsers.add_parser('partidas', help="Partidas IA contra IA (tablero clásico)")
+    p.add_argument('x', help="Jugador X, como 'dificil' o 'dificil,tiempo_limite=0.01'")
+    p.add_argument('o', help="Jugador O")
+    p.add_argument('--cantidad', type=int, default=10)
+    p.add_argument('--semilla', type=int, default=0)
+    p.add_argument('--limite', type=int, default=200)
+    p.add_argument('--repeticiones', type=int, default=3)
+    p.set_defaults(funcion=partidas)
+    return parser
+
+
+def main(argv=None):
+    args = crear_parser().parse_args(argv)
+    args.funcion(args)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,148 @@
+# Entrenamiento por autojuego de la tabla de valores de la dificultad 'aprendida'
+# Miles de partidas avanzan a la vez con lotes.SimuladorLotes (mismas reglas y
+# eliminación de la ficha más antigua que TicTacToe). En cada jugada el valor del
+# estado se acerca al de la mejor jugada (TD(0) al estilo negamax: el valor de
+# un estado es el negativo del que deja al rival). El resultado se exporta con
+# politica.escribir como un byte con signo por estado. Requiere NumPy.
+import argparse
+import time
+
+import numpy as np
+
+import politica
+from lotes import SimuladorLotes, politica_aleatoria
+from tablebase import TOTAL_ESTADOS, BASE_COLA, MAXIMO_FICHAS, NUM_CASILLAS
+
+POTENCIAS = 10 ** np.arange(MAXIMO_FICHAS, dtype=np.int64)
+DIGITOS = np.arange(1, NUM_CASILLAS + 1, dtype=np.int64)[None, :]  # Casilla + 1
+
+
+def codigos(sim):
+    """(N, 2) código base 10 de la cola de cada jugador, como tablebase.CODIGO_COLA"""
+    # Las posiciones vacías valen -1 + 1 = 0 y no suman
+    return ((sim.colas.astype(np.int64) + 1) * POTENCIAS).sum(axis=2)
+
+
+def indices(sim, cods):
+    """(N,) índice de cada partida, como tablebase.indice_estado"""
+    return (sim.turno.astype(np.int64) * BASE_COLA + cods[:, 0]) * BASE_COLA + cods[:, 1]
+
+
+def indices_sucesores(sim, cods):
+    """(N, 9) índice del estado tras jugar cada casilla, esté libre o no"""
+    filas = np.arange(sim.n)
+    turno = sim.turno.astype(np.intp)
+    propio = cods[filas, turno][:, None]
+    rival = cods[filas, 1 - turno][:, None]
+    conteo = sim.conteos[filas, turno].astype(np.int64)[:, None]
+    # Con la cola llena sale el dígito más antiguo y la casilla entra como el más nuevo
+    nuevo = np.where(conteo >= MAXIMO_FICHAS,
+                     propio // 10 + DIGITOS * 10 ** (MAXIMO_FICHAS - 1),
+                     propio + DIGITOS * 10 ** conteo)
+    juega_x = (turno == 0)[:, None]
+    codigo_x = np.where(juega_x, nuevo, rival)
+    codigo_o = np.where(juega_x, rival, nuevo)
+    siguiente = (1 - turno).astype(np.int64)[:, None]
+    return (siguiente * BASE_COLA + codigo_x) * BASE_COLA + codigo_o
+
+
+def entrenar(pasos=4000, n=4096, alfa=0.2, epsilon=0.2, limite=60, semilla=0, al_progresar=None):
+    """
+    Juega `pasos` jugadas en cada una de las n partidas, reiniciando las que
+    terminan o llegan al límite. Retorna los valores (float32, entre -1 y 1)
+    para el jugador en turno de cada índice de estado.
+    """
+    rng = np.random.default_rng(semilla)
+    valores = np.zeros(TOTAL_ESTADOS, dtype=np.float32)
+    sim = SimuladorLotes(n, MAXIMO_FICHAS)
+    for paso in range(pasos):
+        cods = codigos(sim)
+        actuales = indices(sim, cods)
+        disponibles = sim.disponibles()
+
+        # Valor de cada jugada para quien mueve: 1 si gana, si no menos el valor del rival
+        ganadoras = sim.casillas_ganadoras(sim.turno.astype(np.intp))
+        q = np.where(ganadoras, np.float32(1), -valores[indices_sucesores(sim, cods)])
+        q[~disponibles] = -np.inf
+        objetivo = q.max(axis=1)
+        valores[actuales] += alfa * (objetivo - valores[actuales])
+
+        # Epsilon-codicioso: la exploración no cambia el objetivo (aprende la jugada óptima)
+        explorar = rng.random(n) < epsilon
+        casillas = np.where(explorar, politica_aleatoria(sim, rng), q.argmax(axis=1))
+        sim.jugar(casillas)
+
+        terminadas = ~sim.activas(limite)
+        if terminadas.any():
+            sim.reiniciar(terminadas)
+        if al_progresar and paso % 500 == 0:
+            al_progresar(paso, valores)
+    return valores
+
+
+def cuantizar(valores):
+    """Convierte los valores a bytes con signo (-127 a 127)"""
+    escalados = np.clip(np.rint(valores * politica.ESCALA), -politica.ESCALA, politica.ESCALA)
+    return escalados.astype(np.int8).tobytes()
+
+
+def evaluar(tabla, cantidad=2000, semilla=0):
+    """
+    Fracción de posiciones al azar en que la jugada aprendida conserva el
+    resultado perfecto de la tablebase. Retorna None si no hay tablebase.
+    """
+    import random
+    import tablebase
+    from backend import TicTacToe
+
+    perfecta = tablebase.cargar()
+    if perfecta is None:
+        return None
+    rng = random.Random(semilla)
+    aciertos = total = 0
+    while total < cantidad:
+        juego = TicTacToe()
+        for _ in range(rng.randrange(0, 20)):
+            juego.hacer_movimiento(rng.choice(juego.obtener_casillas_disponibles()))
+            if juego.verificar_ganador(juego.jugador_actual):
+                break
+            juego.cambiar_turno()
+        else:
+            estado = juego.estado
+            optima = perfecta.mejor_movimiento(estado)
+            elegida = tabla.mejor_movimiento(estado)
+            valor = lambda c: perfecta.consultar(estado.sucesor(c, tablebase.MAXIMO_FICHAS))[0]
+            aciertos += valor(elegida) == valor(optima)
+            total += 1
+    return aciertos / total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Entrena por autojuego la tabla de la dificultad 'aprendida'")
+    parser.add_argument('--pasos', type=int, default=4000)
+    parser.add_argument('--partidas', type=int, default=4096, help="Partidas simultáneas")
+    parser.add_argument('--alfa', type=float, default=0.2)
+    parser.add_argument('--epsilon', type=float, default=0.2)
+    parser.add_argument('--limite', type=int, default=60, help="Jugadas antes de reiniciar una partida")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--salida', default=politica.RUTA_POR_DEFECTO)
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+
+    def progreso(paso, valores):
+        print(f"paso {paso}: {np.count_nonzero(valores):,} estados visitados "
+              f"({time.perf_counter() - inicio:.1f} s)")
+
+    valores = entrenar(args.pasos, args.partidas, args.alfa, args.epsilon, args.limite,
+                       args.semilla, progreso)
+    ruta = politica.escribir(cuantizar(valores), args.salida)
+    print(f"Tabla escrita en {ruta} ({time.perf_counter() - inicio:.1f} s)")
+
+    acierto = evaluar(politica.TablaAprendida(ruta))
+    if acierto is not None:
+        print(f"Jugadas que conservan el resultado perfecto: {acierto:.1%}")
+
+
+if __name__ == '__main__':
+    main()
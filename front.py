@@ -1,7 +1,28 @@
 # Interfaz gráfica para Tic Tac Toe Rolling
+import queue
+import threading
+import time
 import tkinter as tk
+import tkinter.font as tkfont
 from tkinter import messagebox
-from backend import TicTacToe, IA
+from backend import TicTacToe, IA, RESPALDOS, tabla_de_dificultad
+
+# Variantes del tablero: (tamaño, fichas en línea para ganar, máximo de fichas)
+VARIANTES = {
+    '3x3': ("3×3", (3, 3, 3)),
+    '5x5': ("5×5, 4 en raya", (5, 4, 4)),
+    '7x7': ("7×7, 4 en raya", (7, 4, 5)),
+}
+
+# Dificultades de la IA con su nombre en pantalla
+DIFICULTADES = {
+    'facil': 'Fácil', 'medio': 'Medio', 'dificil': 'Difícil',
+    'perfecto': 'Perfecto', 'mcts': 'MCTS', 'aprendida': 'Aprendida',
+}
+
+# Tiempo mínimo (ms) que se muestra el turno de la IA, incluido su cálculo
+RETARDO_MINIMO_IA = 500
+INTERVALO_SONDEO_IA = 20
 
 # Colores compartidos
 COLORES = {
@@ -10,24 +31,192 @@ COLORES = {
     'fade': "#555555", 'win': "#2e7d32"
 }
 
-class MenuPrincipal:
+class TableroBotones:
+    """Tablero de un tk.Button por casilla; solo se reconfiguran las casillas que cambian"""
+    
+    def __init__(self, padre, n, al_pulsar):
+        self.n = n
+        self.celdas = [None] * (n * n)  # (texto, fg, bg) dibujado en cada casilla
+        self.buttons = []
+        tam_fuente = 40 if n == 3 else max(12, 100 // n)
+        for i in range(n * n):
+            btn = tk.Button(
+                padre,
+                text="",
+                font=('Arial', tam_fuente, 'bold'),
+                width=4,
+                height=2 if n == 3 else 1,
+                bg=COLORES['btn'],
+                fg=COLORES['texto'],
+                activebackground="#2a2a4e",
+                command=lambda idx=i: al_pulsar(idx)
+            )
+            self.buttons.append(btn)
+    
+    def ubicar(self, fila):
+        for i, btn in enumerate(self.buttons):
+            btn.grid(row=fila + i // self.n, column=i % self.n, padx=4, pady=4)
+    
+    def dibujar(self, celdas):
+        for i, celda in enumerate(celdas):
+            if celda != self.celdas[i]:
+                texto, fg, bg = celda
+                self.buttons[i].config(text=texto, fg=fg, bg=bg)
+                self.celdas[i] = celda
+    
+    def habilitar(self, habilitado=True):
+        for btn in self.buttons:
+            btn.config(state=tk.NORMAL if habilitado else tk.DISABLED)
+
+
+class TableroCanvas:
+    """
+    Tablero dibujado en un solo tk.Canvas: cada casilla es un rectángulo y un
+    texto creados una vez. Solo se reconfiguran las casillas que cambian, y al
+    cambiar el tamaño se mueven los elementos sin crear widgets.
+    """
+    
+    def __init__(self, padre, n, al_pulsar, lado=None):
+        self.n = n
+        self.al_pulsar = al_pulsar
+        self.celdas = [None] * (n * n)
+        self.habilitado = True
+        self.lado = lado or (360 if n == 3 else 60 * n)
+        self.origen = (0, 0)  # Esquina del tablero, centrado dentro del canvas
+        self.canvas = tk.Canvas(padre, width=self.lado, height=self.lado, bg=COLORES['bg'],
+                                highlightthickness=0)
+        # Una sola fuente para todas las casillas: cambiar su tamaño las actualiza a todas
+        self.fuente = tkfont.Font(family='Arial', weight='bold')
+        self.rectangulos = [self.canvas.create_rectangle(0, 0, 0, 0, fill=COLORES['btn'], width=0)
+                            for _ in range(n * n)]
+        self.textos = [self.canvas.create_text(0, 0, text="", font=self.fuente, fill=COLORES['texto'])
+                       for _ in range(n * n)]
+        self._posicionar()
+        self.canvas.bind('<Button-1>', self._pulsar)
+        self.canvas.bind('<Configure>', self._redimensionar)
+    
+    def ubicar(self, fila):
+        self.canvas.grid(row=fila, column=0, columnspan=self.n, padx=4, pady=4, sticky='nsew')
+        # La fila del tablero se queda con el espacio sobrante de la ventana
+        padre = self.canvas.master
+        padre.rowconfigure(fila, weight=1)
+        for columna in range(self.n):
+            padre.columnconfigure(columna, weight=1)
+    
+    def _redimensionar(self, event):
+        lado = min(event.width, event.height)
+        origen = ((event.width - lado) / 2, (event.height - lado) / 2)
+        if lado > 0 and (lado, origen) != (self.lado, self.origen):
+            self.lado = lado
+            self.origen = origen
+            self._posicionar()
+    
+    def _posicionar(self):
+        paso = self.lado / self.n
+        margen = max(2, paso * 0.03)
+        for i in range(self.n * self.n):
+            x = self.origen[0] + (i % self.n) * paso
+            y = self.origen[1] + (i // self.n) * paso
+            self.canvas.coords(self.rectangulos[i], x + margen, y + margen, x + paso - margen, y + paso - margen)
+            self.canvas.coords(self.textos[i], x + paso / 2, y + paso / 2)
+        self.fuente.configure(size=-max(8, int(paso * 0.5)))  # Negativo: píxeles
+    
+    def _pulsar(self, event):
+        if not self.habilitado:
+            return
+        paso = self.lado / self.n
+        fila = int((event.y - self.origen[1]) // paso)
+        columna = int((event.x - self.origen[0]) // paso)
+        if 0 <= fila < self.n and 0 <= columna < self.n:
+            self.al_pulsar(fila * self.n + columna)
+    
+    def dibujar(self, celdas):
+        for i, celda in enumerate(celdas):
+            if celda != self.celdas[i]:
+                texto, fg, bg = celda
+                self.canvas.itemconfigure(self.textos[i], text=texto, fill=fg)
+                self.canvas.itemconfigure(self.rectangulos[i], fill=bg)
+                self.celdas[i] = celda
+    
+    def habilitar(self, habilitado=True):
+        self.habilitado = habilitado
+
+
+RENDERIZADORES = {'canvas': TableroCanvas, 'botones': TableroBotones}
+
+
+class Aplicacion:
+    """
+    Una sola ventana Tk para todo el programa. Cada pantalla se crea una vez
+    y se alterna mostrando su frame; las partidas se guardan por modo y tablero.
+    """
+    
     def __init__(self, window):
         self.window = window
-        self.window.title(" Menú Principal ")
         self.window.resizable(True, True)
         self.window.configure(bg=COLORES['bg'])
+        self.actual = None
+        self.juegos = {}  # InterfazJuego por (modo, tamaño, en línea, máximo de fichas)
+        self.menu = MenuPrincipal(self)
+        self.mostrar(self.menu)
+    
+    def mostrar(self, pantalla):
+        """Oculta la pantalla actual y muestra otra ya construida"""
+        if pantalla is self.actual:
+            return
+        if self.actual is not None:
+            self.actual.frame.pack_forget()
+        self.actual = pantalla
+        pantalla.frame.pack(expand=True, fill='both')
+        pantalla.al_mostrar()
+    
+    def mostrar_menu(self):
+        self.mostrar(self.menu)
+    
+    def iniciar_juego(self, modo, dificultad, nombre_x, nombre_o, tamano, en_linea, max_fichas):
+        """Muestra la partida de ese modo y tablero; si ya existía, conserva su juego y su IA"""
+        clave = (modo, tamano, en_linea, max_fichas)
+        interfaz = self.juegos.get(clave)
+        if interfaz is None:
+            interfaz = InterfazJuego(self, modo, dificultad, nombre_x, nombre_o,
+                                     tamano, en_linea, max_fichas)
+            self.juegos[clave] = interfaz
+        else:
+            interfaz.configurar(dificultad, nombre_x, nombre_o)
+        self.mostrar(interfaz)
+
+
+class MenuPrincipal:
+    def __init__(self, app):
+        self.app = app
+        self.window = app.window
         
         self.modo_seleccionado = None
         self.pantalla_actual = 'principal'  # 'principal' o 'nombres'
-        self.en_transicion = False  # Bandera para evitar problemas durante transiciones
         self.base_size = (400, 500)
-        self.last_size = (0, 0)
-
-        self.menu_frame = tk.Frame(window, bg=COLORES['bg'])
+        self.escala = None
+        
+        # Fuentes con nombre: reescalar el menú es cambiar su tamaño, sin recrear widgets
+        self.fuentes = {}
+        
+        self.frame = tk.Frame(self.window, bg=COLORES['bg'])
+        self.menu_frame = tk.Frame(self.frame, bg=COLORES['bg'])
         self.menu_frame.pack(expand=True, fill='both', padx=20, pady=20)
         
+        # Subpantallas creadas una sola vez: 'principal' y una de nombres por modo
+        self.pantallas = {}
+        self.entries_por_modo = {}
+        self.dificultad_var = tk.StringVar(value='medio')
+        self.variante_var = tk.StringVar(value='3x3')
+        
         self.crear_pantalla_principal()
-        self.window.bind('<Configure>', self.on_resize)
+        self.frame.bind('<Configure>', self.on_resize)
+    
+    def al_mostrar(self):
+        self.window.state('normal')
+        self.window.title(" Menú Principal ")
+        if self.pantalla_actual == 'nombres':
+            self.window.geometry("500x520")
 
     def _calcular_escala(self):
         """Calcula factor de escala basado en tamaño de ventana"""
@@ -35,107 +224,142 @@ class MenuPrincipal:
         h = max(self.window.winfo_height(), self.base_size[1])
         raw = min(w / self.base_size[0], h / self.base_size[1])
         return min(1 + (raw - 1) * 0.4 if raw > 1 else raw, 2)
+    
+    def _fuente(self, size, bold=False):
+        """Retorna la fuente compartida para ese tamaño base"""
+        clave = (size, bold)
+        if clave not in self.fuentes:
+            escala = self.escala or 1
+            self.fuentes[clave] = tkfont.Font(family='Arial', size=int(size * escala),
+                                              weight='bold' if bold else 'normal')
+        return self.fuentes[clave]
 
-    def _crear_label(self, texto, size, bold=False, color='texto'):
-        """Crea y empaqueta un label"""
-        font = ('Arial', size, 'bold') if bold else ('Arial', size)
-        lbl = tk.Label(self.menu_frame, text=texto, font=font, 
-                       bg=COLORES['bg'], fg=COLORES[color])
-        return lbl
+    def _crear_label(self, padre, texto, size, bold=False, color='texto'):
+        """Crea un label"""
+        return tk.Label(padre, text=texto, font=self._fuente(size, bold),
+                        bg=COLORES['bg'], fg=COLORES[color])
 
-    def _crear_boton(self, texto, size, width, color, hover, comando):
-        """Crea y empaqueta un botón"""
-        return tk.Button(self.menu_frame, text=texto, font=('Arial', size, 'bold'),
+    def _crear_boton(self, padre, texto, size, width, color, hover, comando):
+        """Crea un botón"""
+        return tk.Button(padre, text=texto, font=self._fuente(size, True),
                         width=width, height=2, bg=COLORES[color], fg="white",
                         activebackground=hover, command=comando)
+    
+    def _mostrar_subpantalla(self, nombre):
+        for clave, frame in self.pantallas.items():
+            if clave != nombre:
+                frame.pack_forget()
+        self.pantallas[nombre].pack(expand=True, fill='both')
 
     def crear_pantalla_principal(self):
-        self._limpiar_frame()
         self.pantalla_actual = 'principal'
-        s = self._calcular_escala()
-        pad = int(15 * s)
-        
-        self._crear_label(" Tres en Raya Rolling ", int(28*s), True, 'x').pack(pady=pad)
-        self._crear_label("¡Solo puedes tener 3 fichas a la vez!", int(12*s)).pack(pady=(0, int(20*s)))
-        self._crear_label("Selecciona el modo de juego:", int(14*s), True).pack(pady=pad)
-        
-        btn_w = int(20 * s)
-        self._crear_boton(" 1 vs 1 ", int(16*s), btn_w, 'x', "#c73850",
-                         lambda: self.mostrar_pantalla_nombres("1vs1")).pack(pady=int(8*s))
-        self._crear_boton("Un Jugador", int(16*s), btn_w, 'o', "#3a9fc4",
-                         lambda: self.mostrar_pantalla_nombres("vs_computadora")).pack(pady=int(8*s))
-        
-        tk.Button(self.menu_frame, text="Salir", font=('Arial', int(12*s)),
-                 width=int(10*s), bg=COLORES['acento'], fg=COLORES['texto'],
-                 activebackground="#5a5a7a", command=self.window.quit).pack(pady=int(20*s))
+        if 'principal' not in self.pantallas:
+            frame = self.pantallas['principal'] = tk.Frame(self.menu_frame, bg=COLORES['bg'])
+            
+            self._crear_label(frame, " Tres en Raya Rolling ", 28, True, 'x').pack(pady=15)
+            self._crear_label(frame, "¡Solo puedes tener 3 fichas a la vez!", 12).pack(pady=(0, 20))
+            self._crear_label(frame, "Selecciona el modo de juego:", 14, True).pack(pady=15)
+            
+            self._crear_boton(frame, " 1 vs 1 ", 16, 20, 'x', "#c73850",
+                             lambda: self.mostrar_pantalla_nombres("1vs1")).pack(pady=8)
+            self._crear_boton(frame, "Un Jugador", 16, 20, 'o', "#3a9fc4",
+                             lambda: self.mostrar_pantalla_nombres("vs_computadora")).pack(pady=8)
+            
+            tk.Button(frame, text="Salir", font=self._fuente(12),
+                     width=10, bg=COLORES['acento'], fg=COLORES['texto'],
+                     activebackground="#5a5a7a", command=self.window.quit).pack(pady=20)
+        self._mostrar_subpantalla('principal')
 
     def mostrar_pantalla_nombres(self, modo):
-        self.en_transicion = True
-        self._limpiar_frame()
         self.pantalla_actual = 'nombres'
         self.modo_seleccionado = modo
         
         # Aumentar tamaño de ventana para pantalla de nombres
-        self.window.geometry("500x450")
+        self.window.geometry("500x520")
         
-        s = self._calcular_escala()
+        nombre = 'nombres-' + modo
+        if nombre not in self.pantallas:
+            self._crear_pantalla_nombres(nombre, modo)
+        self.entries = self.entries_por_modo[modo]
+        self._mostrar_subpantalla(nombre)
+    
+    def _crear_pantalla_nombres(self, nombre, modo):
+        frame = self.pantallas[nombre] = tk.Frame(self.menu_frame, bg=COLORES['bg'])
         
-        self._crear_label(" Ingresa los nombres ", int(28*s), True, 'x').pack(pady=int(20*s))
+        self._crear_label(frame, " Ingresa los nombres ", 28, True, 'x').pack(pady=20)
         
         jugadores = ['Jugador 1 (X)', 'Jugador 2 (O)'] if modo == "1vs1" else ['Jugador (X)']
-        self.entries = {}
+        entries = self.entries_por_modo[modo] = {}
         
         for jugador in jugadores:
-            self._crear_label(jugador, int(16*s)).pack()
-            entry = tk.Entry(self.menu_frame, font=('Arial', int(14*s)), width=25)
-            entry.pack(pady=int(12*s))
-            self.entries[jugador] = entry
+            self._crear_label(frame, jugador, 16).pack()
+            entry = tk.Entry(frame, font=self._fuente(14), width=25)
+            entry.pack(pady=12)
+            entries[jugador] = entry
         
         # Selector de dificultad para modo vs IA
         if modo == "vs_computadora":
-            self._crear_label("Dificultad de la Computadora:", int(16*s), True).pack(pady=(int(20*s), int(8*s)))
+            self._crear_label(frame, "Dificultad de la Computadora:", 16, True).pack(pady=(20, 8))
             
-            self.dificultad_var = tk.StringVar(value='medio')
-            frame_dif = tk.Frame(self.menu_frame, bg=COLORES['bg'])
-            frame_dif.pack(pady=int(8*s))
+            frame_dif = tk.Frame(frame, bg=COLORES['bg'])
+            frame_dif.pack(pady=8)
             
-            dificultades = [('Fácil', 'facil'), ('Medio', 'medio'), ('Difícil', 'dificil')]
-            for texto, valor in dificultades:
-                rb = tk.Radiobutton(
+            self.botones_dificultad = {}
+            for valor, texto in DIFICULTADES.items():
+                rb = self.botones_dificultad[valor] = tk.Radiobutton(
                     frame_dif, text=texto, variable=self.dificultad_var, value=valor,
-                    font=('Arial', int(14*s)), bg=COLORES['bg'], fg=COLORES['texto'],
+                    font=self._fuente(14), bg=COLORES['bg'], fg=COLORES['texto'],
                     selectcolor=COLORES['btn'], activebackground=COLORES['bg'],
                     activeforeground=COLORES['texto']
                 )
-                rb.pack(side='left', padx=int(12*s))
+                rb.pack(side='left', padx=12)
+            # Aviso de las dificultades sin tabla para el tablero elegido (ver _actualizar_dificultades)
+            self.aviso_dificultad = self._crear_label(frame, "", 11, color='fade')
+            self.aviso_dificultad.pack()
+        
+        # Selector del tamaño del tablero
+        self._crear_label(frame, "Tablero:", 16, True).pack(pady=(20, 8))
+        frame_var = tk.Frame(frame, bg=COLORES['bg'])
+        frame_var.pack(pady=8)
+        for valor, (texto, _) in VARIANTES.items():
+            tk.Radiobutton(
+                frame_var, text=texto, variable=self.variante_var, value=valor,
+                font=self._fuente(12), bg=COLORES['bg'], fg=COLORES['texto'],
+                selectcolor=COLORES['btn'], activebackground=COLORES['bg'],
+                activeforeground=COLORES['texto']
+            ).pack(side='left', padx=8)
+        
+        if modo == "vs_computadora":
+            self.variante_var.trace_add('write', lambda *_: self._actualizar_dificultades())
+            self._actualizar_dificultades()
         
         color = 'x' if modo == "1vs1" else 'o'
         hover = "#c73850" if modo == "1vs1" else "#3a9fc4"
-        self._crear_boton("Iniciar Juego", int(18*s), 22, color, hover, 
-                         self.iniciar_juego).pack(pady=int(20*s))
-        
-        self.en_transicion = False
+        self._crear_boton(frame, "Iniciar Juego", 18, 22, color, hover,
+                         self.iniciar_juego).pack(pady=20)
     
-    def _limpiar_frame(self):
-        for widget in self.menu_frame.winfo_children():
-            widget.destroy()
+    def _actualizar_dificultades(self):
+        """Desactiva las dificultades sin tabla para el tablero elegido: la IA jugaría otra en su lugar"""
+        _, reglas = VARIANTES[self.variante_var.get()]
+        sin_tabla = [valor for valor in RESPALDOS if tabla_de_dificultad(valor, *reglas) is None]
+        for valor, boton in self.botones_dificultad.items():
+            boton.configure(state='disabled' if valor in sin_tabla else 'normal')
+        if self.dificultad_var.get() in sin_tabla:
+            self.dificultad_var.set(RESPALDOS[self.dificultad_var.get()])
+        nombres = ', '.join(DIFICULTADES[valor] for valor in sin_tabla)
+        self.aviso_dificultad.configure(text=f"Sin tabla para este tablero: {nombres}" if sin_tabla else "")
     
     def on_resize(self, event):
-        # Evitar recrear durante transiciones
-        if self.en_transicion:
+        # Reescalar solo ajusta el tamaño de las fuentes compartidas
+        escala = self._calcular_escala()
+        if self.escala is not None and abs(escala - self.escala) < 0.05:
             return
-        
-        current = (self.window.winfo_width(), self.window.winfo_height())
-        if abs(current[0] - self.last_size[0]) > 50 or abs(current[1] - self.last_size[1]) > 50:
-            self.last_size = current
-            # Solo recrear si estamos en la pantalla principal
-            if self.pantalla_actual == 'principal':
-                self.crear_pantalla_principal()
-            # No recrear pantalla de nombres para evitar problemas
+        self.escala = escala
+        for (size, _), fuente in self.fuentes.items():
+            fuente.configure(size=int(size * escala))
 
     def iniciar_juego(self):
-        dificultad = getattr(self, 'dificultad_var', None)
-        dificultad = dificultad.get() if dificultad else 'medio'
+        dificultad = self.dificultad_var.get() if self.modo_seleccionado == "vs_computadora" else 'medio'
         
         # Obtener nombres de los jugadores
         if self.modo_seleccionado == "1vs1":
@@ -145,15 +369,16 @@ class MenuPrincipal:
             nombre_x = self.entries['Jugador (X)'].get() or "Jugador"
             nombre_o = "CPU"
         
-        self.window.destroy()
-        InterfazJuego(tk.Tk(), self.modo_seleccionado, dificultad, nombre_x, nombre_o).window.mainloop()
+        _, (tamano, en_linea, max_fichas) = VARIANTES[self.variante_var.get()]
+        self.app.iniciar_juego(self.modo_seleccionado, dificultad, nombre_x, nombre_o,
+                               tamano, en_linea, max_fichas)
+
 
 class InterfazJuego:
-    def __init__(self, window, modo="1vs1", dificultad='medio', nombre_x="Jugador 1", nombre_o="Jugador 2"):
-        self.window = window
-        self.window.title("Tres en Raya Infinito")
-        self.window.resizable(True, True)
-        self.window.state('zoomed')  # Pantalla completa en Windows
+    def __init__(self, app, modo="1vs1", dificultad='medio', nombre_x="Jugador 1", nombre_o="Jugador 2",
+                 tamano=3, en_linea=3, max_fichas=3, renderizador='canvas'):
+        self.app = app
+        self.window = app.window
         self.modo = modo
         
         # Nombres de los jugadores
@@ -161,11 +386,19 @@ class InterfazJuego:
         self.nombre_o = nombre_o
         
         # Inicializar juego
-        self.juego = TicTacToe()
+        self.juego = TicTacToe(tamano, en_linea, max_fichas)
+        n = self.juego.tamano
         
         # Inicializar IA si es modo vs_ia
         self.ia = IA(self.juego, 'O', dificultad) if modo == "vs_computadora" else None
         
+        # La IA calcula en un hilo y deja su resultado en esta cola
+        self._resultados_ia = queue.Queue()
+        self._generacion_ia = 0  # Cambia al cancelar para descartar resultados viejos
+        self._cancelacion_ia = None  # Event de la jugada en curso: cancelar no depende de cuándo empiece
+        self._espera_ia = None
+        self.ia_pensando = False
+        
         # Colores
         self.bg_color = "#1a1a2e"
         self.btn_color = "#16213e"
@@ -174,11 +407,13 @@ class InterfazJuego:
         self.text_color = "#eaeaea"
         self.fade_color = "#555555"  # Color para fichas que van a desaparecer
         
-        self.window.configure(bg=self.bg_color)
+        # Frame de la pantalla, lo muestra y oculta la Aplicacion
+        self.frame = tk.Frame(self.window, bg=self.bg_color)
         
         # Frame contenedor para centrar todo
-        self.main_frame = tk.Frame(window, bg=self.bg_color)
-        self.main_frame.pack(expand=True)
+        # Con canvas el tablero crece con la ventana; los botones tienen tamaño fijo
+        self.main_frame = tk.Frame(self.frame, bg=self.bg_color)
+        self.main_frame.pack(expand=True, fill='both' if renderizador == 'canvas' else 'none')
         
         # Título
         self.label = tk.Label(
@@ -188,35 +423,23 @@ class InterfazJuego:
             bg=self.bg_color,
             fg=self.x_color
         )
-        self.label.grid(row=0, column=0, columnspan=3, pady=12)
+        self.label.grid(row=0, column=0, columnspan=n, pady=12)
         
         # Info del modo rolling
         max_fichas = self.juego.numero_maximo_de_mov
         self.info_label = tk.Label(
             self.main_frame, 
-            text=f"Máximo {max_fichas} fichas por jugador", 
+            text=f"Máximo {max_fichas} fichas por jugador, {self.juego.en_linea} en línea para ganar", 
             font=('Arial', 12),
             bg=self.bg_color,
             fg=self.text_color
         )
-        self.info_label.grid(row=1, column=0, columnspan=3, pady=(0, 8))
+        self.info_label.grid(row=1, column=0, columnspan=n, pady=(0, 8))
         
-        # Crear botones del tablero
-        self.buttons = []
-        for i in range(9):
-            btn = tk.Button(
-                self.main_frame,
-                text="",
-                font=('Arial', 40, 'bold'),
-                width=4,
-                height=2,
-                bg=self.btn_color,
-                fg=self.text_color,
-                activebackground="#2a2a4e",
-                command=lambda idx=i: self.hacer_mov(idx)
-            )
-            btn.grid(row=(i // 3) + 2, column=i % 3, padx=4, pady=4)
-            self.buttons.append(btn)
+        # Tablero: un Canvas o un botón por casilla
+        self.tablero = RENDERIZADORES[renderizador](self.main_frame, n, self.hacer_mov)
+        self.tablero.ubicar(2)
+        self.tablero.dibujar(self._celdas())
         
         # Contador de fichas
         max_f = self.juego.numero_maximo_de_mov
@@ -227,7 +450,7 @@ class InterfazJuego:
             bg=self.bg_color,
             fg=self.text_color
         )
-        self.counter_label.grid(row=5, column=0, columnspan=3, pady=8)
+        self.counter_label.grid(row=n + 2, column=0, columnspan=n, pady=8)
         
         # Botón de reinicio
         self.reset_btn = tk.Button(
@@ -239,7 +462,7 @@ class InterfazJuego:
             activebackground="#5a5a7a",
             command=self.reiniciar_juego
         )
-        self.reset_btn.grid(row=6, column=0, columnspan=3, pady=12)
+        self.reset_btn.grid(row=n + 3, column=0, columnspan=n, pady=12)
         
         # Botón para volver al menú
         texto_menu = "Cambiar Dificultad" if self.modo == "vs_computadora" else "Volver al Menú"
@@ -252,35 +475,32 @@ class InterfazJuego:
             activebackground="#5a5a7a",
             command=self.volver_al_menu
         )
-        self.menu_btn.grid(row=7, column=0, columnspan=3, pady=5)
+        self.menu_btn.grid(row=n + 4, column=0, columnspan=n, pady=5)
     
     def hacer_mov(self, casilla):
+        # Mientras la IA piensa el tablero no acepta clics
+        if self.ia_pensando:
+            return
+        
         # Usar la lógica del backend para hacer el movimiento
         color_actual = self.x_color if self.juego.jugador_actual == 'X' else self.o_color
         
-        exito, casilla_eliminada = self.juego.hacer_movimiento(casilla)
+        exito, _ = self.juego.hacer_movimiento(casilla)
         
         if not exito:
             return
         
-        # Si se eliminó una ficha, actualizar la interfaz
-        if casilla_eliminada is not None:
-            self.buttons[casilla_eliminada].config(text="", fg=self.text_color)
-        
-        # Actualizar el botón con el movimiento
-        self.buttons[casilla].config(text=self.juego.jugador_actual, fg=color_actual)
-        
-        # Marcar la ficha más antigua con color más tenue
-        self.actualizar_color_ficha()
-        
         # Verificar ganador
         combo_ganador = self.juego.verificar_ganador(self.juego.jugador_actual)
+        
+        # Redibujar: la casilla jugada, la eliminada, la que va a desaparecer y las ganadoras
+        self.tablero.dibujar(self._celdas(combo_ganador))
+        
         nombre_ganador = self.nombre_x if self.juego.jugador_actual == 'X' else self.nombre_o
         if combo_ganador:
+            if self.ia:
+                self.ia.detener_ponderacion()
             self.label.config(text=f"¡{nombre_ganador} gana! 🎉", fg=color_actual)
-            # Resaltar las fichas ganadoras
-            for i in combo_ganador:
-                self.buttons[i].config(bg="#2e7d32")
             self.desabilitar_botones()
             messagebox.showinfo("Fin del juego", f"¡{nombre_ganador} gana!")
             return
@@ -297,47 +517,112 @@ class InterfazJuego:
         max_f = self.juego.numero_maximo_de_mov
         self.counter_label.config(text=f"{self.nombre_x}: {x_count}/{max_f}  |  {self.nombre_o}: {o_count}/{max_f}")
         
-        # Si es modo vs IA y es turno de la IA, hacer movimiento
+        # Si es modo vs IA y es turno de la IA, hacer movimiento; si no, pensar mientras juega el humano
         if self.ia and self.juego.jugador_actual == 'O':
-            self.window.after(500, self._movimiento_ia)
+            self._movimiento_ia()
+        elif self.ia:
+            self.ia.ponderar()
     
     def _movimiento_ia(self):
-        """Ejecuta el movimiento de la IA"""
-        casilla = self.ia.obtener_movimiento()
+        """Calcula el movimiento de la IA en un hilo sin bloquear la ventana"""
+        self.ia_pensando = True
+        generacion = self._generacion_ia
+        cancelacion = self._cancelacion_ia = threading.Event()
+        inicio = time.perf_counter()
+        
+        def calcular():
+            casilla = self.ia.obtener_movimiento(cancelacion)
+            self._resultados_ia.put((generacion, casilla, time.perf_counter() - inicio))
+        
+        threading.Thread(target=calcular, daemon=True).start()
+        self._espera_ia = self.window.after(INTERVALO_SONDEO_IA, self._revisar_ia)
+    
+    def _revisar_ia(self):
+        """Revisa desde el hilo principal si la IA ya terminó"""
+        while True:
+            try:
+                generacion, casilla, duracion = self._resultados_ia.get_nowait()
+            except queue.Empty:
+                self._espera_ia = self.window.after(INTERVALO_SONDEO_IA, self._revisar_ia)
+                return
+            if generacion == self._generacion_ia:
+                break
+        
+        # El retardo es un mínimo: el tiempo de cálculo ya cuenta
+        espera = max(0, RETARDO_MINIMO_IA - int(duracion * 1000))
+        self._espera_ia = self.window.after(espera, lambda: self._aplicar_movimiento_ia(generacion, casilla))
+    
+    def _aplicar_movimiento_ia(self, generacion, casilla):
+        self._espera_ia = None
+        if generacion != self._generacion_ia:
+            return
+        self.ia_pensando = False
         if casilla is not None:
             self.hacer_mov(casilla)
     
-    def actualizar_color_ficha(self):
-        # Actualizar colores - la ficha más antigua se muestra más tenue
-        for moves, color in [(self.juego.x_moves, self.x_color), (self.juego.o_moves, self.o_color)]:
+    def _cancelar_ia(self):
+        """Descarta el movimiento pendiente de la IA y detiene su búsqueda"""
+        self._generacion_ia += 1
+        self.ia_pensando = False
+        if self._espera_ia is not None:
+            self.window.after_cancel(self._espera_ia)
+            self._espera_ia = None
+        if self._cancelacion_ia is not None:
+            self._cancelacion_ia.set()
+            self._cancelacion_ia = None
+        if self.ia:
+            self.ia.cancelar()
+    
+    def _celdas(self, combo_ganador=None):
+        """Retorna (texto, fg, bg) de cada casilla según el estado del juego"""
+        celdas = [("", self.text_color, self.btn_color)] * self.juego.geometria.num_casillas
+        for simbolo, moves, color in [('X', self.juego.x_moves, self.x_color), ('O', self.juego.o_moves, self.o_color)]:
             for i, pos in enumerate(moves):
                 if len(moves) >= self.juego.numero_maximo_de_mov and i == 0:
-                    # La ficha más antigua parpadea/se ve diferente
-                    self.buttons[pos].config(fg=self.fade_color)
+                    # La ficha más antigua se ve más tenue: es la próxima en desaparecer
+                    celdas[pos] = (simbolo, self.fade_color, self.btn_color)
                 else:
-                    self.buttons[pos].config(fg=color)
+                    celdas[pos] = (simbolo, color, self.btn_color)
+        for pos in combo_ganador or ():
+            celdas[pos] = celdas[pos][:2] + (COLORES['win'],)
+        return celdas
+    
+    def actualizar_color_ficha(self):
+        self.tablero.dibujar(self._celdas())
     
     def desabilitar_botones(self):
-        for btn in self.buttons:
-            btn.config(state=tk.DISABLED)
+        self.tablero.habilitar(False)
     
     def reiniciar_juego(self):
+        self._cancelar_ia()
         self.juego.reiniciar()
-        for btn in self.buttons:
-            btn.config(text="", state=tk.NORMAL, fg=self.text_color, bg=self.btn_color)
+        self.tablero.habilitar()
+        self.tablero.dibujar(self._celdas())
         self.label.config(text=f"Turno de {self.nombre_x} (X)", fg=self.x_color)
         max_f = self.juego.numero_maximo_de_mov
         self.counter_label.config(text=f"{self.nombre_x}: 0/{max_f}  |  {self.nombre_o}: 0/{max_f}")
+        if self.ia:
+            self.ia.ponderar()
+    
+    def al_mostrar(self):
+        self.window.title("Tres en Raya Infinito")
+        self.window.state('zoomed')  # Pantalla completa en Windows
+    
+    def configurar(self, dificultad, nombre_x, nombre_o):
+        """Reutiliza la pantalla con otros nombres o dificultad: conserva el juego y la IA"""
+        self.nombre_x = nombre_x
+        self.nombre_o = nombre_o
+        if self.ia:
+            self.ia.dificultad = dificultad
+        self.reiniciar_juego()
     
     def volver_al_menu(self):
-        """Cierra el juego actual y abre el menú principal"""
-        self.window.destroy()
-        root = tk.Tk()
-        MenuPrincipal(root)
-        root.mainloop()
+        """Detiene la IA y vuelve al menú principal; esta pantalla queda guardada"""
+        self._cancelar_ia()
+        self.app.mostrar_menu()
 
 
 if __name__ == '__main__':
     root = tk.Tk()
-    app = MenuPrincipal(root)
+    app = Aplicacion(root)
     root.mainloop()
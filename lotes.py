@@ -0,0 +1,175 @@
+# Simulador por lotes: N partidas rolling independientes avanzan a la vez con NumPy
+# Los movimientos, la eliminación de la ficha más antigua y la detección de
+# ganador se calculan vectorizados sobre todo el lote. Requiere NumPy.
+import numpy as np
+
+from backend import EstadoBits, BITS_CASILLA, NUM_CASILLAS, PREFERENCIAS, WIN_COMBINATIONS
+
+VACIO = 0  # En el tablero X se guarda como 1 y O como 2 (turno + 1)
+LINEAS = np.array(WIN_COMBINATIONS, dtype=np.intp)
+ORDEN_PREFERENCIAS = np.array(PREFERENCIAS, dtype=np.intp)
+
+# Para cada casilla, los pares de casillas que completan una línea con ella
+PARES_POR_CASILLA = [
+    (casilla, *[otra for otra in combo if otra != casilla])
+    for combo in WIN_COMBINATIONS for casilla in combo
+]
+
+
+class SimuladorLotes:
+    """
+    Estado de N partidas:
+    - tableros: (N, 9) int8 con 0 vacío, 1 X, 2 O
+    - colas: (N, 2, maximo) int8 con las casillas de cada jugador, la más antigua primero (-1 vacío)
+    - conteos: (N, 2) fichas de cada jugador
+    - turno: (N,) 0 si juega X, 1 si juega O
+    - ganador: (N,) -1 mientras la partida sigue, 0 o 1 cuando gana X u O
+    """
+
+    def __init__(self, n, maximo=3):
+        self.n = n
+        self.maximo = maximo
+        self.tableros = np.zeros((n, NUM_CASILLAS), dtype=np.int8)
+        self.colas = np.full((n, 2, maximo), -1, dtype=np.int8)
+        self.conteos = np.zeros((n, 2), dtype=np.int8)
+        self.turno = np.zeros(n, dtype=np.int8)
+        self.ganador = np.full(n, -1, dtype=np.int8)
+        self.movimientos = np.zeros(n, dtype=np.int32)
+        self._filas = np.arange(n)
+
+    def reiniciar(self, filas):
+        """Vuelve a empezar las partidas indicadas (máscara (N,) o índices)"""
+        self.tableros[filas] = VACIO
+        self.colas[filas] = -1
+        self.conteos[filas] = 0
+        self.turno[filas] = 0
+        self.ganador[filas] = -1
+        self.movimientos[filas] = 0
+
+    def activas(self, limite=None):
+        """Máscara (N,) de partidas sin ganador y, si se indica, bajo el límite de movimientos"""
+        activas = self.ganador < 0
+        if limite is not None:
+            activas &= self.movimientos < limite
+        return activas
+
+    def disponibles(self):
+        """Máscara (N, 9) de casillas vacías"""
+        return self.tableros == VACIO
+
+    def fichas_tras_eliminar(self, jugador):
+        """
+        Máscara (N, 9) de las fichas del jugador (array (N,) de 0/1) después de
+        quitar su ficha más antigua si ya tiene el máximo, como en simular_movimiento.
+        """
+        fichas = self.tableros == (jugador + 1)[:, None]
+        llenos = self.conteos[self._filas, jugador] >= self.maximo
+        viejas = self.colas[self._filas, jugador, 0]
+        fichas[self._filas[llenos], viejas[llenos]] = False
+        return fichas
+
+    def casillas_ganadoras(self, jugador):
+        """Máscara (N, 9) de casillas vacías con las que el jugador (array (N,) de 0/1) completa una línea"""
+        return _casillas_ganadoras(self.fichas_tras_eliminar(jugador), self.disponibles())
+
+    def jugar(self, casillas, activas=None):
+        """
+        Juega la casilla indicada en cada partida activa y pasa el turno si no hubo ganador.
+        Retorna (N,) con la casilla eliminada en cada partida o -1.
+        """
+        if activas is None:
+            activas = self.activas()
+        filas = self._filas[activas]
+        casillas = casillas[activas].astype(np.intp)
+        turno = self.turno[filas].astype(np.intp)
+        eliminadas = np.full(self.n, -1, dtype=np.int8)
+
+        # Quitar la ficha más antigua de quien ya tiene el máximo
+        llenos = self.conteos[filas, turno] >= self.maximo
+        if llenos.any():
+            f, t = filas[llenos], turno[llenos]
+            viejas = self.colas[f, t, 0]
+            self.tableros[f, viejas] = VACIO
+            self.colas[f, t, :-1] = self.colas[f, t, 1:]
+            self.colas[f, t, -1] = -1
+            self.conteos[f, t] -= 1
+            eliminadas[f] = viejas
+
+        # Colocar la ficha nueva al final de la cola
+        self.tableros[filas, casillas] = turno + 1
+        self.colas[filas, turno, self.conteos[filas, turno]] = casillas
+        self.conteos[filas, turno] += 1
+        self.movimientos[filas] += 1
+
+        # Ganador: alguna de las 8 líneas completa con la ficha del jugador
+        lineas = self.tableros[filas][:, LINEAS]
+        gano = (lineas == (turno + 1)[:, None, None]).all(axis=2).any(axis=1)
+        self.ganador[filas[gano]] = turno[gano]
+        self.turno[filas[~gano]] ^= 1
+        return eliminadas
+
+    def a_estado(self, i):
+        """Convierte la partida i en un EstadoBits del backend"""
+        mascaras = [0, 0]
+        colas = [0, 0]
+        for jugador in (0, 1):
+            for posicion in range(self.conteos[i, jugador]):
+                casilla = int(self.colas[i, jugador, posicion])
+                mascaras[jugador] |= 1 << casilla
+                colas[jugador] |= casilla << (BITS_CASILLA * posicion)
+        return EstadoBits(mascaras[0], mascaras[1], colas[0], colas[1], int(self.turno[i]))
+
+
+def politica_aleatoria(sim, rng):
+    """Casilla vacía uniforme al azar en cada partida, como _movimiento_aleatorio"""
+    claves = rng.random((sim.n, NUM_CASILLAS))
+    claves[~sim.disponibles()] = -1.0
+    return claves.argmax(axis=1)
+
+
+def _casillas_ganadoras(fichas, disponibles):
+    """Máscara (N, 9) de casillas vacías que completan una línea con las fichas dadas"""
+    ganadoras = np.zeros_like(disponibles)
+    for casilla, a, b in PARES_POR_CASILLA:
+        ganadoras[:, casilla] |= fichas[:, a] & fichas[:, b]
+    return ganadoras & disponibles
+
+
+def politica_media(sim, rng=None):
+    """Ganar, si no bloquear, si no centro, esquinas y lados, como _movimiento_medio"""
+    disponibles = sim.disponibles()
+    turno = sim.turno.astype(np.intp)
+    ganar = _casillas_ganadoras(sim.fichas_tras_eliminar(turno), disponibles)
+    bloquear = _casillas_ganadoras(sim.fichas_tras_eliminar(1 - turno), disponibles)
+
+    # argmax sobre booleanos da la primera casilla en orden, igual que el backend
+    preferida = ORDEN_PREFERENCIAS[disponibles[:, ORDEN_PREFERENCIAS].argmax(axis=1)]
+    casillas = np.where(bloquear.any(axis=1), bloquear.argmax(axis=1), preferida)
+    return np.where(ganar.any(axis=1), ganar.argmax(axis=1), casillas)
+
+
+def simular(n, politica_x, politica_o, limite=200, maximo=3, semilla=None):
+    """
+    Juega N partidas en paralelo hasta que todas terminan o llegan al límite.
+    Retorna el SimuladorLotes final; ganador == -1 indica tablas por límite.
+    """
+    rng = np.random.default_rng(semilla)
+    sim = SimuladorLotes(n, maximo)
+    activas = sim.activas(limite)
+    while activas.any():
+        casillas_x = politica_x(sim, rng)
+        casillas_o = casillas_x if politica_o is politica_x else politica_o(sim, rng)
+        sim.jugar(np.where(sim.turno == 0, casillas_x, casillas_o), activas)
+        activas = sim.activas(limite)
+    return sim
+
+
+if __name__ == '__main__':
+    import time
+    for nombre_x, px in (('facil', politica_aleatoria), ('medio', politica_media)):
+        for nombre_o, po in (('facil', politica_aleatoria), ('medio', politica_media)):
+            inicio = time.perf_counter()
+            sim = simular(100_000, px, po, semilla=0)
+            duracion = time.perf_counter() - inicio
+            x, o = (sim.ganador == 0).sum(), (sim.ganador == 1).sum()
+            print(f"{nombre_x} vs {nombre_o}: X {x}  O {o}  tablas {sim.n - x - o}  ({duracion:.2f} s)")
@@ -0,0 +1,234 @@
+# Búsqueda Monte Carlo en árbol (MCTS) para la dificultad 'mcts'
+# Selección UCT, simulaciones con las políticas baratas de la IA y paralelismo
+# de raíz: cada proceso hace crecer su propio árbol desde la misma posición y
+# al final se suman las visitas y los puntos de cada jugada de la raíz.
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from backend import EstadoBits, obtener_geometria
+
+TIEMPO_POR_DEFECTO = 0.5   # Segundos por jugada
+EXPLORACION = math.sqrt(2)
+LIMITE_SIMULACION = 60     # Jugadas por simulación antes de declararla tablas
+VERIFICACION = 64          # Iteraciones entre consultas del reloj
+
+
+def politica_aleatoria(estado, maximo, rng):
+    """Casilla candidata al azar, como _movimiento_aleatorio"""
+    return rng.choice(estado.geo.candidatas(estado.x | estado.o))
+
+
+def politica_media(estado, maximo, rng):
+    """
+    Ganar, si no bloquear, como _movimiento_medio. Sin jugada forzada elige al
+    azar en lugar de seguir las preferencias: si no, todas las simulaciones
+    desde un nodo serían la misma partida.
+    """
+    geo = estado.geo
+    disponibles = geo.candidatas(estado.x | estado.o)
+    turno_original = estado.turno
+    for turno in (turno_original, turno_original ^ 1):
+        for casilla in disponibles:
+            estado.turno = turno
+            eliminada = estado.mover(casilla, maximo)
+            gana = geo.gana_con(estado.x if turno == 0 else estado.o, casilla)
+            estado.deshacer(casilla, eliminada)
+            if gana:
+                estado.turno = turno_original
+                return casilla
+    estado.turno = turno_original
+    return rng.choice(disponibles)
+
+
+POLITICAS = {'aleatoria': politica_aleatoria, 'media': politica_media}
+
+
+class Nodo:
+    """
+    Nodo del árbol. visitas y puntos son desde el punto de vista de quien jugó
+    la casilla que lleva a este nodo (1 victoria, 0.5 tablas, 0 derrota).
+    """
+    __slots__ = ('estado', 'casilla', 'padre', 'hijos', 'pendientes', 'visitas', 'puntos', 'gano')
+
+    def __init__(self, estado, casilla=None, padre=None, gano=False):
+        self.estado = estado
+        self.casilla = casilla
+        self.padre = padre
+        self.hijos = []
+        # Un nodo ganado es terminal: no se expande. Se copia: la lista de la geometría es compartida
+        self.pendientes = [] if gano else list(estado.geo.candidatas(estado.x | estado.o))
+        self.visitas = 0
+        self.puntos = 0.0
+        self.gano = gano
+
+    def elegir_hijo(self, exploracion):
+        """Hijo con mayor cota UCT"""
+        log_visitas = math.log(self.visitas)
+        mejor = None
+        mejor_valor = -1.0
+        for hijo in self.hijos:
+            valor = hijo.puntos / hijo.visitas + exploracion * math.sqrt(log_visitas / hijo.visitas)
+            if valor > mejor_valor:
+                mejor = hijo
+                mejor_valor = valor
+        return mejor
+
+
+class BusquedaMCTS:
+    """
+    MCTS con presupuesto de tiempo (y opcionalmente de iteraciones por proceso).
+    Con procesos > 1 reparte la búsqueda en un grupo de procesos que se crea
+    la primera vez y se reutiliza entre jugadas.
+    """
+
+    def __init__(self, maximo=3, tiempo_limite=TIEMPO_POR_DEFECTO, iteraciones=None,
+                 politica='media', procesos=1, exploracion=EXPLORACION, semilla=None):
+        self.maximo = maximo
+        self.tiempo_limite = tiempo_limite
+        self.iteraciones = iteraciones
+        self.politica = politica
+        self.procesos = procesos or os.cpu_count() or 1
+        self.exploracion = exploracion
+        self.rng = random.Random(semilla)
+        self.total_iteraciones = 0
+        self._detenido = False
+        self.interrumpida = False  # La última búsqueda se detuvo o canceló antes de su presupuesto
+        self.cancelacion = None  # threading.Event de la solicitud en curso, como en MotorBusqueda
+
+    def buscar(self, estado):
+        """Retorna la casilla más visitada para el jugador en turno del estado"""
+        self._detenido = False
+        self.interrumpida = False
+        geo = estado.geo
+        disponibles = geo.candidatas(estado.x | estado.o)
+        if not disponibles:
+            return None
+
+        # Una victoria inmediata no necesita búsqueda
+        for casilla in disponibles:
+            hijo = estado.sucesor(casilla, self.maximo)
+            if geo.gana_con(hijo.o if estado.turno else hijo.x, casilla):
+                return casilla
+
+        # Dentro de un proceso hijo (autojuego, servidor) no se abre otro grupo de procesos
+        if self.procesos > 1 and multiprocessing.parent_process() is None:
+            estadisticas = self._buscar_en_paralelo(estado)
+        else:
+            estadisticas = self.estadisticas_raiz(estado)
+        # Los procesos del grupo terminan por tiempo: el corte se ve aquí
+        self.interrumpida = self._detenido or (self.cancelacion is not None and self.cancelacion.is_set())
+        return max(estadisticas, key=lambda casilla: estadisticas[casilla][0])
+
+    def estadisticas_raiz(self, estado):
+        """Busca en este proceso. Retorna {casilla: [visitas, puntos]} de la raíz."""
+        geo = estado.geo
+        maximo = self.maximo
+        politica = POLITICAS[self.politica]
+        rng = self.rng
+        fin = time.perf_counter() + self.tiempo_limite if self.tiempo_limite else None
+        raiz = Nodo(estado)
+
+        iteracion = 0
+        while self.iteraciones is None or iteracion < self.iteraciones:
+            if not iteracion % VERIFICACION and iteracion:
+                if (self._detenido or (self.cancelacion is not None and self.cancelacion.is_set())
+                        or (fin is not None and time.perf_counter() >= fin)):
+                    break
+            iteracion += 1
+
+            # Selección
+            nodo = raiz
+            while not nodo.pendientes and nodo.hijos:
+                nodo = nodo.elegir_hijo(self.exploracion)
+
+            # Expansión
+            if nodo.pendientes:
+                casilla = nodo.pendientes.pop(rng.randrange(len(nodo.pendientes)))
+                hijo = nodo.estado.sucesor(casilla, maximo)
+                gano = geo.gana_con(hijo.x if nodo.estado.turno == 0 else hijo.o, casilla)
+                nodo = Nodo(hijo, casilla, nodo, gano)
+                nodo.padre.hijos.append(nodo)
+
+            # Simulación: ganador 0 (X), 1 (O) o None
+            if nodo.gano:
+                ganador = nodo.estado.turno ^ 1
+            else:
+                ganador = self._simular(nodo.estado, politica, rng)
+
+            # Retropropagación
+            while nodo is not None:
+                nodo.visitas += 1
+                if ganador is None:
+                    nodo.puntos += 0.5
+                elif ganador != nodo.estado.turno:
+                    # Ganó quien jugó para llegar a este nodo
+                    nodo.puntos += 1.0
+                nodo = nodo.padre
+
+        self.total_iteraciones = iteracion
+        return {hijo.casilla: [hijo.visitas, hijo.puntos] for hijo in raiz.hijos}
+
+    def _simular(self, estado, politica, rng):
+        """Juega al azar con la política hasta que alguien gana o se llega al límite"""
+        estado = estado.copiar()
+        geo = estado.geo
+        for _ in range(LIMITE_SIMULACION):
+            casilla = politica(estado, self.maximo, rng)
+            estado.colocar(casilla, self.maximo)
+            if geo.gana_con(estado.o if estado.turno else estado.x, casilla):
+                return estado.turno
+            estado.turno ^= 1
+        return None
+
+    def _buscar_en_paralelo(self, estado):
+        """Un árbol por proceso desde la misma raíz; suma las estadísticas de la raíz"""
+        ejecutor = _obtener_ejecutor(self.procesos)
+        geo = estado.geo
+        tupla = (estado.x, estado.o, estado.cola_x, estado.cola_o, estado.turno)
+        futuros = [
+            ejecutor.submit(_buscar_en_proceso, tupla, geo.n, geo.k, self.maximo, self.tiempo_limite,
+                            self.iteraciones, self.politica, self.exploracion, self.rng.getrandbits(64))
+            for _ in range(self.procesos)
+        ]
+        combinadas = {}
+        self.total_iteraciones = 0
+        for futuro in futuros:
+            estadisticas, iteraciones = futuro.result()
+            self.total_iteraciones += iteraciones
+            for casilla, (visitas, puntos) in estadisticas.items():
+                acumulado = combinadas.setdefault(casilla, [0, 0.0])
+                acumulado[0] += visitas
+                acumulado[1] += puntos
+        return combinadas
+
+    def detener(self):
+        """Corta la búsqueda en este proceso; los procesos del grupo terminan por tiempo"""
+        self._detenido = True
+
+
+# Grupo de procesos compartido por todas las búsquedas del proceso principal
+_ejecutor = None
+_procesos_ejecutor = 0
+
+
+def _obtener_ejecutor(procesos):
+    global _ejecutor, _procesos_ejecutor
+    if _ejecutor is None or _procesos_ejecutor < procesos:
+        if _ejecutor is not None:
+            _ejecutor.shutdown(wait=False)
+        _ejecutor = ProcessPoolExecutor(procesos)
+        _procesos_ejecutor = procesos
+    return _ejecutor
+
+
+def _buscar_en_proceso(tupla, tamano, en_linea, maximo, tiempo_limite, iteraciones,
+                       politica, exploracion, semilla):
+    """Punto de entrada de los procesos: retorna (estadísticas de la raíz, iteraciones)"""
+    estado = EstadoBits(*tupla, geo=obtener_geometria(tamano, en_linea))
+    busqueda = BusquedaMCTS(maximo, tiempo_limite, iteraciones, politica, 1, exploracion, semilla)
+    estadisticas = busqueda.estadisticas_raiz(estado)
+    return estadisticas, busqueda.total_iteraciones
@@ -0,0 +1,248 @@
+# Telemetría de la IA: estadísticas por movimiento y exportación de trazas
+# Se activa con IA(..., telemetria=Telemetria()). Sin telemetría la IA usa el
+# MotorBusqueda normal, así que desactivada no agrega ningún costo.
+#
+# Formatos de exportación:
+# - exportar_chrome: Trace Event JSON (chrome://tracing, Perfetto, speedscope)
+# - exportar_pilas: pilas plegadas "a;b;c valor" (flamegraph.pl, speedscope, inferno)
+import argparse
+import json
+import os
+import time
+
+from backend import MotorBusqueda, TicTacToe, IA, INFERIOR
+
+
+class TablaContada(dict):
+    """Tabla de transposición que cuenta consultas, aciertos y cortes beta guardados"""
+
+    def __init__(self):
+        super().__init__()
+        self.consultas = 0
+        self.aciertos = 0
+        self.cortes = 0
+
+    def get(self, clave, defecto=None):
+        self.consultas += 1
+        entrada = dict.get(self, clave)
+        if entrada is None:
+            return defecto
+        self.aciertos += 1
+        return entrada
+
+    def __setitem__(self, clave, entrada):
+        # Un nodo que falla alto se guarda como cota inferior: hubo poda
+        if entrada[2] == INFERIOR:
+            self.cortes += 1
+        dict.__setitem__(self, clave, entrada)
+
+
+class MotorInstrumentado(MotorBusqueda):
+    """MotorBusqueda que mide cada nodo; los contadores se reinician en cada búsqueda"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tabla = TablaContada()
+        self._reiniciar_contadores()
+
+    def _reiniciar_contadores(self):
+        self.tabla.consultas = self.tabla.aciertos = self.tabla.cortes = 0
+        self.profundidad_selectiva = 0
+        self.llamadas_ganador = 0
+        self.llamadas_evaluacion = 0
+        self.ns_ganador = 0
+        self.ns_evaluacion = 0
+        self.ns_busqueda = 0
+
+    def buscar(self, estado):
+        self._reiniciar_contadores()
+        inicio = time.perf_counter_ns()
+        try:
+            return super().buscar(estado)
+        finally:
+            self.ns_busqueda = time.perf_counter_ns() - inicio
+
+    def _negamax(self, estado, profundidad, alfa, beta, ply):
+        if ply > self.profundidad_selectiva:
+            self.profundidad_selectiva = ply
+        return super()._negamax(estado, profundidad, alfa, beta, ply)
+
+    def _hay_ganador(self, estado, turno, casilla):
+        inicio = time.perf_counter_ns()
+        resultado = super()._hay_ganador(estado, turno, casilla)
+        self.ns_ganador += time.perf_counter_ns() - inicio
+        self.llamadas_ganador += 1
+        return resultado
+
+    def _evaluar_tablero(self, estado):
+        inicio = time.perf_counter_ns()
+        resultado = super()._evaluar_tablero(estado)
+        self.ns_evaluacion += time.perf_counter_ns() - inicio
+        self.llamadas_evaluacion += 1
+        return resultado
+
+    def estadisticas(self):
+        """Contadores de la última búsqueda"""
+        return {
+            'nodos': self.nodos,
+            'profundidad': self.profundidad_alcanzada,
+            'profundidad_selectiva': self.profundidad_selectiva,
+            'cortes': self.tabla.cortes,
+            'consultas_tabla': self.tabla.consultas,
+            'aciertos_tabla': self.tabla.aciertos,
+            'llamadas_hay_ganador': self.llamadas_ganador,
+            'llamadas_evaluar_tablero': self.llamadas_evaluacion,
+            'us_hay_ganador': self.ns_ganador / 1000,
+            'us_evaluar_tablero': self.ns_evaluacion / 1000,
+            'us_busqueda': self.ns_busqueda / 1000,
+        }
+
+
+class Telemetria:
+    """
+    Recibe una medición por cada movimiento de la IA. `al_medir(medicion)` se
+    llama con un dict por movimiento; con guardar=True también se acumulan
+    para exportarlas.
+    """
+
+    def __init__(self, al_medir=None, guardar=True):
+        self.al_medir = al_medir
+        self.guardar = guardar
+        self.mediciones = []
+        self._origen = time.perf_counter_ns()
+
+    def medir(self, ia, calcular):
+        """Ejecuta calcular() (la jugada de la IA) y registra su medición"""
+        motor = ia.motor
+        motor._reiniciar_contadores()
+        motor.nodos = motor.profundidad_alcanzada = 0
+        aciertos_cache = ia.cache.aciertos if ia.cache is not None else 0
+        inicio = time.perf_counter_ns()
+        casilla = calcular()
+        fin = time.perf_counter_ns()
+
+        medicion = {
+            'dificultad': ia.dificultad,
+            'simbolo': ia.simbolo,
+            'casilla': casilla,
+            'inicio_us': (inicio - self._origen) / 1000,
+            'us_total': (fin - inicio) / 1000,
+            'acierto_cache': ia.cache is not None and ia.cache.aciertos > aciertos_cache,
+        }
+        medicion.update(motor.estadisticas())
+        if self.guardar:
+            self.mediciones.append(medicion)
+        if self.al_medir is not None:
+            self.al_medir(medicion)
+        return casilla
+
+    def resumen(self):
+        """Totales y promedios de las mediciones guardadas"""
+        n = len(self.mediciones)
+        if not n:
+            return {'movimientos': 0}
+        total = lambda campo: sum(m[campo] for m in self.mediciones)
+        tiempos = sorted(m['us_total'] for m in self.mediciones)
+        return {
+            'movimientos': n,
+            'aciertos_cache': sum(m['acierto_cache'] for m in self.mediciones),
+            'nodos': total('nodos'),
+            'nodos_por_segundo': total('nodos') / (total('us_busqueda') / 1e6) if total('us_busqueda') else 0,
+            'profundidad_media': total('profundidad') / n,
+            'profundidad_selectiva_max': max(m['profundidad_selectiva'] for m in self.mediciones),
+            'cortes': total('cortes'),
+            'aciertos_tabla': total('aciertos_tabla'),
+            'consultas_tabla': total('consultas_tabla'),
+            'us_hay_ganador': total('us_hay_ganador'),
+            'us_evaluar_tablero': total('us_evaluar_tablero'),
+            'us_total': total('us_total'),
+            'p50_us': tiempos[n // 2],
+            'p99_us': tiempos[min(n - 1, int(0.99 * n))],
+        }
+
+    def _tramos(self, medicion):
+        """Tiempo propio (µs) de cada función en la pila de un movimiento"""
+        raiz = f"obtener_movimiento;{medicion['dificultad']}"
+        busqueda = raiz + ';buscar'
+        propio_busqueda = (medicion['us_busqueda'] - medicion['us_hay_ganador']
+                           - medicion['us_evaluar_tablero'])
+        return [
+            (raiz, max(0.0, medicion['us_total'] - medicion['us_busqueda'])),
+            (busqueda, max(0.0, propio_busqueda)),
+            (busqueda + ';_hay_ganador', medicion['us_hay_ganador']),
+            (busqueda + ';_evaluar_tablero', medicion['us_evaluar_tablero']),
+        ]
+
+    def exportar_pilas(self, ruta):
+        """Escribe pilas plegadas con el tiempo propio en microsegundos"""
+        acumulado = {}
+        for medicion in self.mediciones:
+            for pila, valor in self._tramos(medicion):
+                acumulado[pila] = acumulado.get(pila, 0.0) + valor
+        with open(ruta, 'w', encoding='utf-8') as f:
+            for pila, valor in acumulado.items():
+                if valor >= 1:
+                    f.write(f"{pila} {int(valor)}\n")
+
+    def exportar_chrome(self, ruta):
+        """
+        Escribe un Trace Event JSON: un evento por movimiento con sus contadores
+        como argumentos, y dentro la búsqueda con el tiempo de _hay_ganador y
+        _evaluar_tablero agregado en tramos consecutivos.
+        """
+        eventos = []
+        pid = os.getpid()
+        for medicion in self.mediciones:
+            inicio = medicion['inicio_us']
+            argumentos = {k: v for k, v in medicion.items() if k != 'inicio_us'}
+            eventos.append({'name': 'obtener_movimiento', 'cat': medicion['dificultad'], 'ph': 'X',
+                            'ts': inicio, 'dur': medicion['us_total'], 'pid': pid, 'tid': 0,
+                            'args': argumentos})
+            if not medicion['us_busqueda']:
+                continue
+            eventos.append({'name': 'buscar', 'cat': 'busqueda', 'ph': 'X', 'ts': inicio,
+                            'dur': medicion['us_busqueda'], 'pid': pid, 'tid': 0})
+            desplazamiento = inicio
+            for nombre in ('_hay_ganador', '_evaluar_tablero'):
+                duracion = medicion['us_' + nombre.lstrip('_')]
+                eventos.append({'name': nombre, 'cat': 'busqueda', 'ph': 'X', 'ts': desplazamiento,
+                                'dur': duracion, 'pid': pid, 'tid': 0})
+                desplazamiento += duracion
+            eventos.append({'name': 'nodos', 'ph': 'C', 'ts': inicio, 'pid': pid,
+                            'args': {'nodos': medicion['nodos'], 'cortes': medicion['cortes']}})
+        with open(ruta, 'w', encoding='utf-8') as f:
+            json.dump({'traceEvents': eventos, 'displayTimeUnit': 'ms'}, f)
+
+
+def main(argv=None):
+    # Importación diferida: el corpus fijo vive en los benchmarks
+    from benchmarks import generar_corpus
+
+    parser = argparse.ArgumentParser(
+        description="Perfila la IA sobre el corpus de benchmarks para ajustar presupuestos")
+    parser.add_argument('--dificultad', default='dificil')
+    parser.add_argument('--profundidad', type=int)
+    parser.add_argument('--tiempo-limite', type=float)
+    parser.add_argument('--limite-nodos', type=int)
+    parser.add_argument('--chrome', metavar='RUTA', help="Traza Trace Event JSON")
+    parser.add_argument('--pilas', metavar='RUTA', help="Pilas plegadas para flame graphs")
+    args = parser.parse_args(argv)
+
+    telemetria = Telemetria()
+    juego = TicTacToe()
+    for estado in generar_corpus():
+        juego.estado = estado.copiar()
+        ia = IA(juego, juego.jugador_actual, args.dificultad, args.profundidad,
+                args.tiempo_limite, args.limite_nodos, telemetria=telemetria)
+        ia.obtener_movimiento()
+
+    for campo, valor in telemetria.resumen().items():
+        print(f"{campo:<28}{valor:>14,.2f}" if isinstance(valor, float) else f"{campo:<28}{valor:>14,}")
+    if args.chrome:
+        telemetria.exportar_chrome(args.chrome)
+    if args.pilas:
+        telemetria.exportar_pilas(args.pilas)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+# Tabla de valores aprendida por autojuego (ver entrenamiento.py)
+# Un byte con signo por estado, con el mismo índice que la tablebase, desde el
+# punto de vista del jugador en turno (-127 pierde, 127 gana). Se consulta con
+# mmap y sin NumPy: elegir jugada es una lectura por casilla legal.
+import os
+
+# MAXIMO_FICHAS es parte de esta interfaz: la IA lo compara con las reglas del juego
+from tablebase import TablaMapeada, cargar_tabla, escribir_tabla, TOTAL_ESTADOS, MAXIMO_FICHAS
+
+RUTA_POR_DEFECTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'politica.bin')
+
+MAGICO = b'TTRP'
+VERSION = 1
+ESCALA = 127
+
+
+class TablaAprendida(TablaMapeada):
+    """
+    Valores aprendidos: mejor_movimiento gana de inmediato si puede y si no
+    deja al rival en el estado de menor valor
+    """
+    MAGICO = MAGICO
+    VERSION = VERSION
+
+    def __init__(self, ruta=RUTA_POR_DEFECTO):
+        super().__init__(ruta)
+
+    def valor(self, estado):
+        """Valor del estado para el jugador en turno, entre -127 y 127"""
+        byte = self.byte(estado)
+        return byte - 256 if byte > 127 else byte
+
+    def _orden(self, estado, casilla, hijo):
+        if estado.geo.gana_con(hijo.o if estado.turno else hijo.x, casilla):
+            return (0, 0)
+        return (1, self.valor(hijo))
+
+
+def escribir(valores, ruta=RUTA_POR_DEFECTO):
+    """Escribe los valores (bytes con signo, uno por índice de estado) de forma atómica"""
+    if len(valores) != TOTAL_ESTADOS:
+        raise ValueError(f"Se esperaban {TOTAL_ESTADOS} valores")
+    return escribir_tabla(ruta, MAGICO, VERSION, valores)
+
+
+def cargar(ruta=RUTA_POR_DEFECTO):
+    """Abre la tabla aprendida una sola vez por proceso. Retorna None si no existe."""
+    return cargar_tabla(TablaAprendida, ruta)
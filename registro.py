@@ -0,0 +1,150 @@
+# Registro binario de partidas: archivo de solo agregado, un byte por movimiento
+#
+# Cabecera del archivo (8 bytes): b'TTRR', versión, tamaño, en línea, máximo de fichas.
+# Cada partida: largo y nombre de X, largo y nombre de O, largo y dificultad
+# (un byte de largo + UTF-8 cada uno), resultado (1 byte), cantidad de
+# movimientos (4 bytes) y luego una casilla por byte. La casilla eliminada no
+# se guarda: se deduce al reproducir la partida.
+import mmap
+import os
+import struct
+from collections import namedtuple
+
+from backend import TicTacToe
+
+MAGICO = b'TTRR'
+VERSION = 1
+TAM_CABECERA = 8
+CANTIDAD = struct.Struct('<BI')  # Resultado y cantidad de movimientos
+
+# Resultados
+SIN_TERMINAR, GANA_X, GANA_O, TABLAS = 0, 1, 2, 3
+RESULTADO_GANADOR = {'X': GANA_X, 'O': GANA_O}
+
+Partida = namedtuple('Partida', 'nombre_x nombre_o dificultad resultado movimientos')
+
+
+def _texto(valor):
+    # Se corta en 255 bytes sin partir un carácter de varios bytes
+    datos = (valor or '').encode('utf-8')[:255].decode('utf-8', 'ignore').encode('utf-8')
+    return bytes([len(datos)]) + datos
+
+
+class EscritorRegistro:
+    """Agrega partidas a un archivo de registro con las reglas dadas"""
+
+    def __init__(self, ruta, tamano=3, en_linea=3, max_fichas=3):
+        if tamano * tamano > 256:
+            raise ValueError("El registro guarda cada casilla en un byte: máximo 16x16")
+        cabecera = MAGICO + bytes([VERSION, tamano, en_linea, max_fichas])
+        existe = os.path.exists(ruta) and os.path.getsize(ruta) > 0
+        if existe:
+            with open(ruta, 'rb') as f:
+                if f.read(TAM_CABECERA) != cabecera:
+                    raise ValueError(f"{ruta} tiene otro formato u otras reglas")
+        self._archivo = open(ruta, 'ab')
+        if not existe:
+            self._archivo.write(cabecera)
+        self.reglas = (tamano, en_linea, max_fichas)
+
+    def escribir(self, nombre_x, nombre_o, dificultad, resultado, movimientos):
+        """Agrega una partida completa de una sola escritura"""
+        self._archivo.write(
+            _texto(nombre_x) + _texto(nombre_o) + _texto(dificultad)
+            + CANTIDAD.pack(resultado, len(movimientos)) + bytes(movimientos))
+
+    def grabar(self, juego, nombre_x='', nombre_o='', dificultad=None):
+        """
+        Conecta el escritor a juego.al_mover y retorna la PartidaEnCurso.
+        La partida se escribe al llamar a su método terminar().
+        """
+        if (juego.tamano, juego.en_linea, juego.numero_maximo_de_mov) != self.reglas:
+            raise ValueError("El juego no usa las reglas de este registro")
+        partida = PartidaEnCurso(self, nombre_x, nombre_o, dificultad)
+        juego.al_mover = partida.movimiento
+        return partida
+
+    def vaciar(self):
+        self._archivo.flush()
+
+    def cerrar(self):
+        self._archivo.close()
+
+
+class PartidaEnCurso:
+    """Acumula los movimientos de una partida (un byte cada uno) hasta que termina"""
+
+    def __init__(self, escritor, nombre_x, nombre_o, dificultad):
+        self.escritor = escritor
+        self.nombre_x = nombre_x
+        self.nombre_o = nombre_o
+        self.dificultad = dificultad
+        self.movimientos = bytearray()
+        self.terminada = False
+
+    def movimiento(self, casilla, casilla_eliminada=None):
+        self.movimientos.append(casilla)
+
+    def terminar(self, ganador=None, resultado=None):
+        """Escribe la partida. ganador es 'X', 'O' o None (sin terminar)."""
+        if self.terminada:
+            return
+        self.terminada = True
+        if resultado is None:
+            resultado = RESULTADO_GANADOR.get(ganador, SIN_TERMINAR)
+        self.escritor.escribir(self.nombre_x, self.nombre_o, self.dificultad,
+                               resultado, self.movimientos)
+
+
+class LectorRegistro:
+    """Recorre un registro mapeado en memoria sin cargar todas las partidas"""
+
+    def __init__(self, ruta):
+        with open(ruta, 'rb') as f:
+            self._datos = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        cabecera = self._datos[:TAM_CABECERA]
+        if cabecera[:4] != MAGICO or cabecera[4] != VERSION:
+            self._datos.close()
+            raise ValueError(f"{ruta} no es un registro de partidas")
+        self.tamano, self.en_linea, self.max_fichas = cabecera[5], cabecera[6], cabecera[7]
+
+    def __iter__(self):
+        datos = self._datos
+        fin = len(datos)
+        pos = TAM_CABECERA
+        while pos < fin:
+            textos = []
+            for _ in range(3):
+                if pos >= fin or pos + 1 + datos[pos] > fin:
+                    # Última partida cortada dentro de la cabecera
+                    return
+                largo = datos[pos]
+                # 'replace': archivos anteriores podían cortar un nombre a mitad de carácter
+                textos.append(datos[pos + 1:pos + 1 + largo].decode('utf-8', 'replace'))
+                pos += 1 + largo
+            if pos + CANTIDAD.size > fin:
+                return
+            resultado, cantidad = CANTIDAD.unpack_from(datos, pos)
+            pos += CANTIDAD.size
+            if pos + cantidad > fin:
+                # Última partida a medio escribir
+                return
+            yield Partida(textos[0], textos[1], textos[2] or None, resultado, datos[pos:pos + cantidad])
+            pos += cantidad
+
+    def reconstruir(self, partida, hasta=None):
+        """
+        Retorna un TicTacToe con los primeros `hasta` movimientos de la partida
+        (todos si es None), listo para seguir jugando desde ahí.
+        """
+        juego = TicTacToe(self.tamano, self.en_linea, self.max_fichas)
+        for casilla in partida.movimientos[:hasta]:
+            jugador = juego.jugador_actual
+            juego.hacer_movimiento(casilla)
+            if juego.verificar_ganador(jugador):
+                break
+            juego.cambiar_turno()
+        return juego
+
+    def cerrar(self):
+        self._datos.close()
@@ -0,0 +1,285 @@
+# Servidor asyncio de partidas Tic Tac Toe Rolling
+# Mantiene muchas sesiones en un solo proceso y habla JSON por líneas sobre TCP.
+#
+# Peticiones (una por línea):
+#   {"op": "nueva", "modo": "vs_computadora", "dificultad": "medio",
+#    "tamano": 3, "en_linea": 3, "max_fichas": 3}
+#   {"op": "mover", "sesion": 1, "casilla": 4}
+#   {"op": "estado", "sesion": 1}
+#   {"op": "cerrar", "sesion": 1}
+#   {"op": "stats"}
+# Cada respuesta es una línea {"ok": true, ...} o {"ok": false, "error": "..."}.
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from backend import TicTacToe, IA, EstadoBits
+from registro import EscritorRegistro, TABLAS
+
+MUESTRAS_LATENCIA = 2000  # Latencias recientes de la IA usadas para los percentiles
+TAM_MAXIMO_LINEA = 4096
+TAMANO_MAXIMO = 16        # Lado máximo del tablero (también el límite del registro)
+MAX_FICHAS_MAXIMO = 16
+# Cada dificultad deja una IA por proceso del ejecutor: solo se aceptan las conocidas
+DIFICULTADES = ('facil', 'medio', 'dificil', 'perfecto', 'mcts', 'aprendida')
+
+
+# IA por configuración en cada proceso o hilo del ejecutor. La tabla de
+# transposición usa el estado completo como clave, así que se comparte entre sesiones.
+_local = threading.local()
+
+
+def _calcular_movimiento(tamano, en_linea, max_fichas, dificultad, simbolo, estado):
+    """Calcula la jugada de la IA para el estado (x, o, cola_x, cola_o, turno)"""
+    ias = getattr(_local, 'ias', None)
+    if ias is None:
+        ias = _local.ias = {}
+    clave = (tamano, en_linea, max_fichas, dificultad, simbolo)
+    if clave not in ias:
+        # El ejecutor ya reparte las peticiones: la IA no abre su propio grupo de procesos
+        ias[clave] = IA(TicTacToe(tamano, en_linea, max_fichas), simbolo, dificultad,
+                        procesos=1)
+    ia = ias[clave]
+    ia.juego.estado = EstadoBits(*estado, geo=ia.juego.geometria)
+    return ia.obtener_movimiento()
+
+
+class Sesion:
+    """Una partida en el servidor; la IA vive en el ejecutor, no en la sesión"""
+    __slots__ = ('juego', 'dificultad', 'ocupada', 'terminada', 'tablas', 'grabacion')
+
+    def __init__(self, juego, dificultad, grabacion=None):
+        self.juego = juego
+        self.dificultad = dificultad  # None en modo 1vs1
+        self.ocupada = False          # La IA está calculando
+        self.terminada = False
+        self.tablas = False           # Terminó con el tablero lleno y sin ganador
+        self.grabacion = grabacion    # PartidaEnCurso si se archivan las partidas
+
+    def archivar(self):
+        """Escribe la partida en el registro, terminada o no"""
+        if self.grabacion is not None:
+            self.grabacion.terminar(self.juego.ganador_actual, TABLAS if self.tablas else None)
+            self.grabacion.escritor.vaciar()
+            self.grabacion = None
+
+    def descripcion(self):
+        juego = self.juego
+        return {
+            'tablero': ''.join(juego.tablero),
+            'tamano': juego.tamano,
+            'turno': juego.jugador_actual,
+            'ganador': juego.ganador_actual,
+            'tablas': self.tablas,
+            'x_moves': juego.x_moves,
+            'o_moves': juego.o_moves,
+        }
+
+
+class ErrorProtocolo(Exception):
+    """Petición inválida; el mensaje se envía al cliente"""
+
+
+class Servidor:
+    def __init__(self, ejecutor, directorio_registro=None):
+        self.ejecutor = ejecutor
+        self.directorio_registro = directorio_registro
+        self._escritores = {}  # Un registro por combinación de reglas
+        self.sesiones = {}
+        self._siguiente_id = 1
+        self.conexiones = 0
+        self.movimientos = 0
+        self.movimientos_ia = 0
+        self.latencias_ia = deque(maxlen=MUESTRAS_LATENCIA)
+        self.inicio = time.monotonic()
+
+    async def atender(self, lector, escritor):
+        """Atiende una conexión: lee peticiones línea por línea y responde en orden"""
+        self.conexiones += 1
+        propias = set()
+        try:
+            while True:
+                linea = await lector.readline()
+                if not linea:
+                    break
+                try:
+                    peticion = json.loads(linea)
+                    respuesta = await self.procesar(peticion, propias)
+                    respuesta['ok'] = True
+                except (ErrorProtocolo, ValueError, KeyError, TypeError) as error:
+                    respuesta = {'ok': False, 'error': str(error)}
+                escritor.write(json.dumps(respuesta, separators=(',', ':')).encode() + b'\n')
+                await escritor.drain()
+        except (ConnectionError, ValueError):
+            # Conexión cortada o línea más larga que TAM_MAXIMO_LINEA
+            pass
+        finally:
+            # Las sesiones pertenecen a la conexión que las creó
+            for id_sesion in propias:
+                self.sesiones.pop(id_sesion).archivar()
+            self.conexiones -= 1
+            escritor.close()
+
+    async def procesar(self, peticion, propias):
+        if not isinstance(peticion, dict):
+            raise ErrorProtocolo("La petición debe ser un objeto JSON")
+        op = peticion.get('op')
+        if op == 'nueva':
+            return self._nueva(peticion, propias)
+        if op == 'mover':
+            return await self._mover(self._sesion(peticion, propias), int(peticion['casilla']))
+        if op == 'estado':
+            return {'estado': self._sesion(peticion, propias).descripcion()}
+        if op == 'cerrar':
+            self._sesion(peticion, propias)
+            propias.discard(peticion['sesion'])
+            self.sesiones.pop(peticion['sesion']).archivar()
+            return {}
+        if op == 'stats':
+            return {'stats': self.estadisticas()}
+        raise ErrorProtocolo(f"Operación desconocida: {op}")
+
+    def _sesion(self, peticion, propias):
+        id_sesion = peticion.get('sesion')
+        if id_sesion not in propias:
+            raise ErrorProtocolo(f"Sesión inexistente: {id_sesion}")
+        return self.sesiones[id_sesion]
+
+    def _nueva(self, peticion, propias):
+        tamano = int(peticion.get('tamano', 3))
+        en_linea = int(peticion.get('en_linea', 3))
+        max_fichas = int(peticion.get('max_fichas', 3))
+        # Las tablas del tablero se construyen en el bucle de eventos: se acotan las reglas
+        if not 1 <= tamano <= TAMANO_MAXIMO:
+            raise ErrorProtocolo(f"tamano debe estar entre 1 y {TAMANO_MAXIMO}")
+        if not 1 <= en_linea <= tamano:
+            raise ErrorProtocolo("en_linea debe estar entre 1 y tamano")
+        if not 1 <= max_fichas <= MAX_FICHAS_MAXIMO:
+            raise ErrorProtocolo(f"max_fichas debe estar entre 1 y {MAX_FICHAS_MAXIMO}")
+        # Sin historial para deshacer: una sesión puede durar indefinidamente
+        juego = TicTacToe(tamano, en_linea, max_fichas, largo_historial=0)
+        dificultad = None
+        if peticion.get('modo', 'vs_computadora') == 'vs_computadora':
+            dificultad = peticion.get('dificultad', 'medio')
+            if dificultad not in DIFICULTADES:
+                raise ErrorProtocolo(f"dificultad debe ser una de: {', '.join(DIFICULTADES)}")
+        grabacion = None
+        if self.directorio_registro is not None:
+            nombre_o = 'cliente' if dificultad is None else 'CPU'
+            grabacion = self._escritor(juego).grabar(juego, 'cliente', nombre_o, dificultad)
+        id_sesion = self._siguiente_id
+        self._siguiente_id += 1
+        self.sesiones[id_sesion] = Sesion(juego, dificultad, grabacion)
+        propias.add(id_sesion)
+        return {'sesion': id_sesion, 'estado': self.sesiones[id_sesion].descripcion()}
+
+    def _escritor(self, juego):
+        reglas = (juego.tamano, juego.en_linea, juego.numero_maximo_de_mov)
+        if reglas not in self._escritores:
+            nombre = 'partidas-{}x{}-{}-{}.ttr'.format(reglas[0], *reglas)
+            ruta = os.path.join(self.directorio_registro, nombre)
+            self._escritores[reglas] = EscritorRegistro(ruta, *reglas)
+        return self._escritores[reglas]
+
+    def _jugar(self, sesion, casilla):
+        """Aplica una jugada y retorna su descripción"""
+        juego = sesion.juego
+        jugador = juego.jugador_actual
+        exito, eliminada = juego.hacer_movimiento(casilla)
+        if not exito:
+            raise ErrorProtocolo(f"Casilla no disponible: {casilla}")
+        self.movimientos += 1
+        if juego.verificar_ganador(jugador):
+            sesion.terminada = True
+            sesion.archivar()
+        else:
+            juego.cambiar_turno()
+            # Con max_fichas * 2 >= casillas el tablero puede llenarse: nadie puede jugar
+            if not juego.obtener_casillas_disponibles():
+                sesion.terminada = sesion.tablas = True
+                sesion.archivar()
+        return {'jugador': jugador, 'casilla': casilla, 'eliminada': eliminada}
+
+    async def _mover(self, sesion, casilla):
+        if sesion.terminada:
+            raise ErrorProtocolo("La partida terminó")
+        if sesion.ocupada:
+            raise ErrorProtocolo("La IA está jugando")
+        if not 0 <= casilla < sesion.juego.geometria.num_casillas:
+            raise ErrorProtocolo(f"Casilla fuera del tablero: {casilla}")
+
+        jugadas = [self._jugar(sesion, casilla)]
+        juego = sesion.juego
+        if sesion.dificultad is not None and not sesion.terminada:
+            # La búsqueda corre en el ejecutor para no detener el bucle de eventos
+            sesion.ocupada = True
+            inicio = time.perf_counter()
+            try:
+                estado = juego.estado
+                respuesta = await asyncio.get_running_loop().run_in_executor(
+                    self.ejecutor, _calcular_movimiento, juego.tamano, juego.en_linea,
+                    juego.numero_maximo_de_mov, sesion.dificultad, juego.jugador_actual,
+                    (estado.x, estado.o, estado.cola_x, estado.cola_o, estado.turno))
+            finally:
+                sesion.ocupada = False
+            self.latencias_ia.append(time.perf_counter() - inicio)
+            self.movimientos_ia += 1
+            if respuesta is not None:
+                jugadas.append(self._jugar(sesion, respuesta))
+        return {'jugadas': jugadas, 'estado': sesion.descripcion()}
+
+    def estadisticas(self):
+        latencias = sorted(self.latencias_ia)
+
+        def percentil(p):
+            if not latencias:
+                return None
+            return round(latencias[min(len(latencias) - 1, int(p / 100 * len(latencias)))] * 1000, 3)
+
+        return {
+            'sesiones': len(self.sesiones),
+            'conexiones': self.conexiones,
+            'movimientos': self.movimientos,
+            'movimientos_ia': self.movimientos_ia,
+            'latencia_ia_ms': {'p50': percentil(50), 'p95': percentil(95), 'p99': percentil(99)},
+            'segundos_activo': round(time.monotonic() - self.inicio, 1),
+        }
+
+
+async def servir(host, puerto, ejecutor, directorio_registro=None):
+    if directorio_registro is not None:
+        os.makedirs(directorio_registro, exist_ok=True)
+    servidor = Servidor(ejecutor, directorio_registro)
+    tcp = await asyncio.start_server(servidor.atender, host, puerto, limit=TAM_MAXIMO_LINEA)
+    direcciones = ', '.join(str(s.getsockname()) for s in tcp.sockets)
+    print(f"Servidor escuchando en {direcciones}")
+    async with tcp:
+        await tcp.serve_forever()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servidor de partidas Tic Tac Toe Rolling")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--trabajadores', type=int, default=None, help="Procesos o hilos para la IA")
+    parser.add_argument('--hilos', action='store_true',
+                        help="Calcular la IA en hilos en lugar de procesos")
+    parser.add_argument('--registro', metavar='DIRECTORIO',
+                        help="Archivar cada partida en registros binarios (ver registro.py)")
+    args = parser.parse_args(argv)
+
+    clase = ThreadPoolExecutor if args.hilos else ProcessPoolExecutor
+    with clase(args.trabajadores) as ejecutor:
+        try:
+            asyncio.run(servir(args.host, args.puerto, ejecutor, args.registro))
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,239 @@
+# Tabla de resultados perfectos (tablebase) para Tic Tac Toe Rolling
+# Resuelve por análisis retrógrado todos los estados del juego con 3 fichas
+# por jugador y los guarda en un archivo binario que se consulta con mmap.
+import mmap
+import os
+import sys
+from collections import deque
+from itertools import permutations
+
+from backend import EstadoBits, NUM_CASILLAS, BITS_CASILLA, MASCARA_CASILLA, tiene_linea
+
+MAXIMO_FICHAS = 3
+RUTA_POR_DEFECTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tablebase.bin')
+
+# Formato del archivo: cabecera de 8 bytes y luego un byte por índice de estado.
+# Cada byte guarda el resultado en los 2 bits altos y la distancia en los 6 bajos.
+MAGICO = b'TTRB'
+VERSION = 1
+TAM_CABECERA = 8
+BASE_COLA = 10 ** MAXIMO_FICHAS       # Cada cola se codifica en base 10 (casilla + 1)
+TOTAL_ESTADOS = 2 * BASE_COLA * BASE_COLA
+
+# Resultados, siempre desde el punto de vista del jugador en turno
+TABLAS, VICTORIA, DERROTA, INVALIDO = 0, 1, 2, 3
+MAXIMA_DISTANCIA = 63
+
+
+def _codigos_cola():
+    """
+    Código base 10 de cada cola empaquetada, por cantidad de fichas. Cada nivel
+    suma un dígito al anterior: se construye al importar y debe ser barato.
+    """
+    codigos = [[0] * (1 << (BITS_CASILLA * MAXIMO_FICHAS))]
+    for n in range(1, MAXIMO_FICHAS + 1):
+        anterior = codigos[-1]
+        desplazamiento = BITS_CASILLA * (n - 1)
+        peso = 10 ** (n - 1)
+        codigos.append([codigo + ((cola >> desplazamiento & MASCARA_CASILLA) + 1) * peso
+                        for cola, codigo in enumerate(anterior)])
+    return codigos
+
+
+CODIGO_COLA = _codigos_cola()
+
+
+def indice_estado(estado):
+    """Retorna el índice del estado en la tabla (tablero, edades y turno)"""
+    codigo_x = CODIGO_COLA[estado.x.bit_count()][estado.cola_x]
+    codigo_o = CODIGO_COLA[estado.o.bit_count()][estado.cola_o]
+    return (estado.turno * BASE_COLA + codigo_x) * BASE_COLA + codigo_o
+
+
+def _empaquetar(movimientos):
+    mascara = cola = 0
+    for i, casilla in enumerate(movimientos):
+        mascara |= 1 << casilla
+        cola |= casilla << (BITS_CASILLA * i)
+    return mascara, cola
+
+
+def enumerar_estados():
+    """Genera todos los estados válidos: X juega primero y las fichas se alternan"""
+    for nx in range(MAXIMO_FICHAS + 1):
+        for x_moves in permutations(range(NUM_CASILLAS), nx):
+            x, cola_x = _empaquetar(x_moves)
+            libres = [i for i in range(NUM_CASILLAS) if not (x >> i) & 1]
+            for no in range(min(nx, MAXIMO_FICHAS) + 1):
+                turnos = []
+                if no == nx:
+                    turnos.append(0)
+                if no == nx - 1 or no == nx == MAXIMO_FICHAS:
+                    turnos.append(1)
+                if not turnos:
+                    continue
+                for o_moves in permutations(libres, no):
+                    o, cola_o = _empaquetar(o_moves)
+                    for turno in turnos:
+                        yield EstadoBits(x, o, cola_x, cola_o, turno)
+
+
+def resolver():
+    """
+    Resuelve el juego por análisis retrógrado.
+    Retorna un bytearray con un byte por índice de estado.
+    """
+    tabla = bytearray([INVALIDO << 6]) * TOTAL_ESTADOS
+    resuelto = {}
+    pendientes = {}
+    predecesores = {}
+    cola = deque()
+
+    for estado in enumerar_estados():
+        indice = indice_estado(estado)
+        mias, suyas = (estado.o, estado.x) if estado.turno else (estado.x, estado.o)
+        if tiene_linea(mias):
+            # Inalcanzable: el jugador en turno ya habría ganado antes
+            continue
+        if tiene_linea(suyas):
+            # El rival acaba de completar una línea
+            resuelto[indice] = (DERROTA, 0)
+            cola.append(indice)
+            continue
+
+        hijos = estado.casillas_disponibles()
+        pendientes[indice] = len(hijos)
+        for casilla in hijos:
+            hijo = indice_estado(estado.sucesor(casilla, MAXIMO_FICHAS))
+            predecesores.setdefault(hijo, []).append(indice)
+
+    # Propagación hacia atrás en orden de distancia creciente
+    while cola:
+        indice = cola.popleft()
+        resultado, distancia = resuelto[indice]
+        for padre in predecesores.get(indice, ()):
+            if padre in resuelto:
+                continue
+            if resultado == DERROTA:
+                # Hay una jugada que deja al rival perdido
+                resuelto[padre] = (VICTORIA, distancia + 1)
+                cola.append(padre)
+            else:
+                pendientes[padre] -= 1
+                if pendientes[padre] == 0:
+                    # Todas las jugadas dejan al rival ganando
+                    resuelto[padre] = (DERROTA, distancia + 1)
+                    cola.append(padre)
+
+    for indice in pendientes:
+        tabla[indice] = TABLAS << 6
+    for indice, (resultado, distancia) in resuelto.items():
+        if distancia > MAXIMA_DISTANCIA:
+            raise ValueError(f"Distancia {distancia} no cabe en 6 bits")
+        tabla[indice] = resultado << 6 | distancia
+    return tabla
+
+
+def escribir_tabla(ruta, magico, version, datos):
+    """Escribe cabecera y datos (un byte por índice de estado) de forma atómica"""
+    temporal = ruta + '.tmp'
+    with open(temporal, 'wb') as f:
+        f.write(magico + bytes([version, MAXIMO_FICHAS, 0, 0]))
+        f.write(datos)
+    os.replace(temporal, ruta)
+    return ruta
+
+
+def generar(ruta=RUTA_POR_DEFECTO):
+    """Resuelve el juego y escribe la tabla en un archivo binario"""
+    return escribir_tabla(ruta, MAGICO, VERSION, resolver())
+
+
+class TablaMapeada:
+    """
+    Consulta de solo lectura sobre un archivo de un byte por índice de estado,
+    mapeado en memoria. Las subclases fijan MAGICO y VERSION de su cabecera y
+    _orden, la preferencia de cada jugada para mejor_movimiento.
+    """
+    MAGICO = None
+    VERSION = None
+
+    def __init__(self, ruta):
+        with open(ruta, 'rb') as f:
+            self._datos = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        cabecera = self._datos[:TAM_CABECERA]
+        if cabecera[:4] != self.MAGICO or cabecera[4] != self.VERSION or cabecera[5] != MAXIMO_FICHAS:
+            self._datos.close()
+            raise ValueError(f"{ruta} no es una tabla compatible")
+        if len(self._datos) != TAM_CABECERA + TOTAL_ESTADOS:
+            self._datos.close()
+            raise ValueError(f"{ruta} está incompleta")
+
+    def byte(self, estado):
+        return self._datos[TAM_CABECERA + indice_estado(estado)]
+
+    def _orden(self, estado, casilla, hijo):
+        raise NotImplementedError
+
+    def mejor_movimiento(self, estado):
+        """Retorna la casilla de menor _orden para el jugador en turno; la primera en caso de empate"""
+        mejor_casilla = None
+        mejor_orden = None
+        for casilla in estado.casillas_disponibles():
+            orden = self._orden(estado, casilla, estado.sucesor(casilla, MAXIMO_FICHAS))
+            if mejor_orden is None or orden < mejor_orden:
+                mejor_orden = orden
+                mejor_casilla = casilla
+        return mejor_casilla
+
+    def cerrar(self):
+        self._datos.close()
+
+
+class Tablebase(TablaMapeada):
+    """
+    Resultados perfectos: mejor_movimiento gana lo antes posible, si no puede
+    asegura tablas, y si pierde retrasa la derrota lo más posible
+    """
+    MAGICO = MAGICO
+    VERSION = VERSION
+
+    def __init__(self, ruta=RUTA_POR_DEFECTO):
+        super().__init__(ruta)
+
+    def consultar(self, estado):
+        """Retorna (resultado, distancia) para el jugador en turno del estado"""
+        valor = self.byte(estado)
+        return valor >> 6, valor & MAXIMA_DISTANCIA
+
+    def _orden(self, estado, casilla, hijo):
+        resultado, distancia = self.consultar(hijo)
+        # El resultado del hijo es del rival: su derrota es nuestra victoria
+        if resultado == DERROTA:
+            return (0, distancia)
+        if resultado == TABLAS:
+            return (1, 0)
+        return (2, -distancia)
+
+
+# Tablas abiertas por ruta, compartidas por todas las IA del proceso
+_abiertas = {}
+
+
+def cargar_tabla(clase, ruta):
+    """Abre la tabla de la clase una sola vez por proceso. Retorna None si el archivo no existe."""
+    if ruta not in _abiertas:
+        if not os.path.exists(ruta):
+            return None
+        _abiertas[ruta] = clase(ruta)
+    return _abiertas[ruta]
+
+
+def cargar(ruta=RUTA_POR_DEFECTO):
+    """Abre la tablebase una sola vez por proceso. Retorna None si no existe."""
+    return cargar_tabla(Tablebase, ruta)
+
+
+if __name__ == '__main__':
+    destino = sys.argv[1] if len(sys.argv) > 1 else RUTA_POR_DEFECTO
+    print(f"Tabla escrita en {generar(destino)}")
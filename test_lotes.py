@@ -0,0 +1,49 @@
+# Pruebas del simulador por lotes contra el backend, partida por partida
+#   python -m pytest -q
+import pytest
+
+np = pytest.importorskip('numpy')
+
+import lotes
+from backend import IA, TicTacToe, tiene_linea
+
+PARTIDAS = 300
+
+
+@pytest.mark.parametrize('maximo', [3, 4])
+def test_jugadas_y_ganador_coinciden_con_el_backend(maximo):
+    rng = np.random.default_rng(maximo)
+    sim = lotes.SimuladorLotes(PARTIDAS, maximo)
+    estados = [sim.a_estado(i) for i in range(PARTIDAS)]
+    activas = sim.activas(60)
+    while activas.any():
+        casillas = lotes.politica_aleatoria(sim, rng)
+        eliminadas = sim.jugar(casillas, activas)
+        for i in np.flatnonzero(activas):
+            turno = estados[i].turno
+            esperada = estados[i].colocar(int(casillas[i]), maximo)
+            assert eliminadas[i] == (-1 if esperada is None else esperada)
+            gano = tiene_linea(estados[i].o if turno else estados[i].x)
+            assert (sim.ganador[i] == turno) == gano
+            if not gano:
+                estados[i].turno ^= 1
+            assert sim.a_estado(i).clave() == estados[i].clave()
+        activas = sim.activas(60)
+
+
+def test_politica_media_coincide_con_la_ia():
+    rng = np.random.default_rng(0)
+    sim = lotes.SimuladorLotes(PARTIDAS)
+    ias = {simbolo: IA(TicTacToe(), simbolo, 'medio', tam_cache=0) for simbolo in 'XO'}
+    activas = sim.activas(40)
+    while activas.any():
+        medias = lotes.politica_media(sim)
+        for i in np.flatnonzero(activas):
+            estado = sim.a_estado(i)
+            ia = ias['O' if estado.turno else 'X']
+            ia.juego.estado = estado
+            ia.juego.jugador_actual = ia.simbolo
+            assert medias[i] == ia.obtener_movimiento()
+        # Se avanza al azar para recorrer posiciones variadas
+        sim.jugar(lotes.politica_aleatoria(sim, rng), activas)
+        activas = sim.activas(40)
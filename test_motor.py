@@ -0,0 +1,280 @@
+# Pruebas del motor y de la IA: jugadas y deshacer, hash de Zobrist, tabla de evaluación,
+# tablebase, caché de jugadas, presupuesto y cancelación
+#   python -m pytest -q
+import random
+import threading
+import time
+
+import pytest
+
+import tablebase
+from backend import IA, EstadoBits, MotorBusqueda, TicTacToe, obtener_geometria, tabla_de_dificultad
+
+REGLAS = [(3, 3, 3), (4, 4, 4), (5, 4, 4), (7, 5, 5)]
+
+
+@pytest.mark.parametrize('tamano, en_linea, maximo', REGLAS)
+def test_mover_y_deshacer_coinciden_con_sucesor(tamano, en_linea, maximo):
+    geo = obtener_geometria(tamano, en_linea)
+    rng = random.Random(tamano * 100 + maximo)
+    for _ in range(750):
+        estado = EstadoBits(geo=geo)
+        pila = []
+        for _ in range(rng.randrange(1, 40)):
+            casilla = rng.choice(estado.casillas_disponibles())
+            esperado = estado.sucesor(casilla, maximo)
+            clave = estado.clave()
+            eliminada = estado.mover(casilla, maximo)
+            pila.append((casilla, clave, eliminada))
+            assert estado.clave() == esperado.clave()
+        while pila:
+            casilla, clave, eliminada = pila.pop()
+            estado.deshacer(casilla, eliminada)
+            assert estado.clave() == clave
+        assert estado.clave() == EstadoBits(geo=geo).clave()
+
+
+@pytest.mark.parametrize('tamano, en_linea, maximo', REGLAS[:3] + [(3, 3, 2)])
+def test_hash_incremental_coincide_con_zobrist(tamano, en_linea, maximo):
+    rng = random.Random(tamano * en_linea * maximo)
+    for _ in range(100):
+        juego = TicTacToe(tamano, en_linea, maximo, tablas_por_repeticion=3, largo_historial=None)
+        anteriores = []
+        for _ in range(rng.randrange(1, 60)):
+            anteriores.append((juego.hash, dict(juego.repeticiones), juego.estado.clave()))
+            juego.hacer_movimiento(rng.choice(juego.obtener_casillas_disponibles()))
+            assert juego.hash == juego.estado.zobrist(maximo)
+            if juego.verificar_ganador(juego.jugador_actual):
+                break
+            juego.cambiar_turno()
+            assert juego.hash == juego.estado.zobrist(maximo)
+        while anteriores:
+            juego.deshacer_movimiento()
+            assert (juego.hash, juego.repeticiones, juego.estado.clave()) == anteriores.pop()
+
+
+def test_zobrist_sin_colisiones_en_el_tablero_clasico():
+    hashes = set()
+    total = 0
+    for estado in tablebase.enumerar_estados():
+        hashes.add(estado.zobrist(tablebase.MAXIMO_FICHAS))
+        total += 1
+    assert total == 139690
+    assert len(hashes) == total
+
+
+def test_tabla_evaluacion_coincide_con_evaluar_lineas():
+    geo = obtener_geometria(3, 3)
+    tabla = geo.tabla_evaluacion()
+    n = geo.num_casillas
+    rng = random.Random(0)
+    for _ in range(20000):
+        x = o = 0
+        for casilla in range(n):
+            valor = rng.randrange(3)
+            if valor == 1:
+                x |= 1 << casilla
+            elif valor == 2:
+                o |= 1 << casilla
+        assert tabla[x | o << n] == geo.evaluar_lineas(x, o)
+        assert -tabla[x | o << n] == geo.evaluar_lineas(o, x)
+
+
+def test_tabla_evaluacion_solo_en_tableros_pequenos():
+    assert obtener_geometria(4, 4).tabla_evaluacion() is None
+
+
+@pytest.fixture(scope='module')
+def resultados():
+    return tablebase.resolver()
+
+
+def _consultar(resultados, estado):
+    valor = resultados[tablebase.indice_estado(estado)]
+    return valor >> 6, valor & tablebase.MAXIMA_DISTANCIA
+
+
+def test_tablebase_coherente_con_las_jugadas(resultados):
+    maximo = tablebase.MAXIMO_FICHAS
+    for estado in tablebase.enumerar_estados():
+        resultado, distancia = _consultar(resultados, estado)
+        mias, suyas = (estado.o, estado.x) if estado.turno else (estado.x, estado.o)
+        geo = estado.geo
+        if geo.tiene_linea(mias):
+            assert resultado == tablebase.INVALIDO
+            continue
+        if geo.tiene_linea(suyas):
+            assert (resultado, distancia) == (tablebase.DERROTA, 0)
+            continue
+
+        hijos = [_consultar(resultados, estado.sucesor(casilla, maximo))
+                 for casilla in estado.casillas_disponibles()]
+        derrotas = [d for r, d in hijos if r == tablebase.DERROTA]
+        if resultado == tablebase.VICTORIA:
+            # La victoria más corta pasa por la derrota más corta del rival
+            assert derrotas and min(derrotas) == distancia - 1
+        elif resultado == tablebase.DERROTA:
+            # Todas las jugadas pierden; la más larga retrasa la derrota
+            assert all(r == tablebase.VICTORIA for r, _ in hijos)
+            assert max(d for _, d in hijos) == distancia - 1
+        else:
+            assert resultado == tablebase.TABLAS and distancia == 0
+            assert not derrotas
+            assert any(r == tablebase.TABLAS for r, _ in hijos)
+
+
+def test_tablebase_elige_jugadas_que_conservan_el_resultado(tmp_path):
+    ruta = tablebase.generar(str(tmp_path / 'tablebase.bin'))
+    tabla = tablebase.Tablebase(ruta)
+    try:
+        rng = random.Random(0)
+        estados = list(tablebase.enumerar_estados())
+        for estado in rng.sample(estados, 5000):
+            resultado, _ = tabla.consultar(estado)
+            if resultado not in (tablebase.VICTORIA, tablebase.TABLAS):
+                continue
+            hijo = estado.sucesor(tabla.mejor_movimiento(estado), tablebase.MAXIMO_FICHAS)
+            esperado = tablebase.DERROTA if resultado == tablebase.VICTORIA else tablebase.TABLAS
+            assert tabla.consultar(hijo)[0] == esperado
+    finally:
+        tabla.cerrar()
+
+
+def _ia_sin_jugadas_en_cache(ia):
+    return not ia.cache.datos and not ia._exactas.datos
+
+
+def test_busqueda_cancelada_no_se_guarda_en_cache():
+    juego = TicTacToe()
+    ia = IA(juego, 'X', 'dificil', profundidad=12)
+    cancelacion = threading.Event()
+    temporizador = threading.Timer(0.005, cancelacion.set)
+    temporizador.start()
+    try:
+        ia.obtener_movimiento(cancelacion)
+    finally:
+        temporizador.cancel()
+    assert ia.motor.interrumpida
+    assert _ia_sin_jugadas_en_cache(ia)
+
+
+def test_busqueda_sin_presupuesto_no_se_guarda_en_cache():
+    ia = IA(TicTacToe(), 'X', 'dificil', profundidad=12, limite_nodos=50)
+    ia.obtener_movimiento()
+    assert _ia_sin_jugadas_en_cache(ia)
+
+    # Una búsqueda completa sí se guarda y se repite desde la caché
+    completa = IA(TicTacToe(), 'X', 'dificil', profundidad=2)
+    casilla = completa.obtener_movimiento()
+    assert completa.cache.datos and completa.obtener_movimiento() == casilla
+
+
+def test_mcts_cancelada_no_se_guarda_en_cache():
+    ia = IA(TicTacToe(), 'X', 'mcts', tiempo_limite=5.0, procesos=1)
+    cancelacion = threading.Event()
+    temporizador = threading.Timer(0.01, cancelacion.set)
+    temporizador.start()
+    try:
+        ia.obtener_movimiento(cancelacion)
+    finally:
+        temporizador.cancel()
+    assert ia._mcts.interrumpida
+    assert _ia_sin_jugadas_en_cache(ia)
+
+
+@pytest.mark.parametrize('limite_nodos', [1, 100, 500, 1500])
+def test_limite_nodos_se_respeta(limite_nodos):
+    juego = TicTacToe(5, 4, 4)
+    for casilla in (12, 6, 18):
+        juego.hacer_movimiento(casilla)
+        juego.cambiar_turno()
+    motor = MotorBusqueda(juego.numero_maximo_de_mov, 64, limite_nodos=limite_nodos)
+    casilla, _ = motor.buscar(juego.estado.copiar())
+    assert juego.casilla_disponible(casilla)
+    assert motor.interrumpida
+    assert motor.nodos <= limite_nodos
+
+
+def _ia_en_5x5(tiempo_limite):
+    juego = TicTacToe(5, 4, 4)
+    juego.hacer_movimiento(12)
+    juego.cambiar_turno()
+    return IA(juego, 'O', 'dificil', tiempo_limite=tiempo_limite)
+
+
+def _en_hilo(funcion, *args):
+    resultado = []
+    hilo = threading.Thread(target=lambda: resultado.append(funcion(*args)))
+    hilo.start()
+    return hilo, resultado
+
+
+def test_cancelar_antes_de_buscar_no_busca():
+    ia = _ia_en_5x5(5.0)
+    cancelacion = threading.Event()
+    cancelacion.set()
+    assert ia.obtener_movimiento(cancelacion) is None
+    assert ia.motor.nodos == 0
+
+
+def test_cancelar_corta_la_busqueda_en_curso():
+    ia = _ia_en_5x5(5.0)
+    cancelacion = threading.Event()
+    hilo, resultado = _en_hilo(ia.obtener_movimiento, cancelacion)
+    time.sleep(0.05)
+    cancelacion.set()
+    hilo.join(1.0)
+    assert not hilo.is_alive()
+    assert ia.motor.interrumpida and len(resultado) == 1
+
+
+def test_cancelar_una_solicitud_no_afecta_a_la_siguiente():
+    ia = _ia_en_5x5(0.3)
+    vieja = threading.Event()
+    hilo_viejo, _ = _en_hilo(ia.obtener_movimiento, vieja)
+    time.sleep(0.05)
+    vieja.set()
+    # La solicitud nueva espera a que la vieja suelte el motor y busca con su propio token
+    hilo_nuevo, resultado = _en_hilo(ia.obtener_movimiento, threading.Event())
+    hilo_viejo.join(1.0)
+    hilo_nuevo.join(2.0)
+    assert not hilo_nuevo.is_alive()
+    assert resultado[0] is not None and ia.juego.casilla_disponible(resultado[0])
+    assert ia.motor.profundidad_alcanzada > 0
+
+
+def test_jugada_despues_de_ponderar():
+    ia = _ia_en_5x5(0.05)
+    ia.juego.hacer_movimiento(6)
+    ia.juego.cambiar_turno()
+    assert ia.ponderar()
+    time.sleep(0.05)
+    ia.detener_ponderacion()
+    ia.juego.hacer_movimiento(ia.prediccion if ia.prediccion is not None else 0)
+    ia.juego.cambiar_turno()
+    casilla = ia.obtener_movimiento()
+    assert ia.juego.casilla_disponible(casilla)
+
+
+@pytest.mark.parametrize('dificultad', ['perfecto', 'aprendida'])
+def test_dificultades_con_tabla_solo_en_el_tablero_clasico(dificultad):
+    assert tabla_de_dificultad(dificultad, 5, 4, 4) is None
+    assert tabla_de_dificultad(dificultad, 3, 3, 4) is None
+    assert tabla_de_dificultad('medio', 3, 3, 3) is None
+
+
+def test_tabla_aprendida_ida_y_vuelta(tmp_path):
+    import politica
+    valores = bytes(i % 256 for i in range(tablebase.TOTAL_ESTADOS))
+    ruta = politica.escribir(valores, str(tmp_path / 'politica.bin'))
+    tabla = politica.cargar(ruta)
+    try:
+        assert politica.cargar(ruta) is tabla
+        for estado in random.Random(0).sample(list(tablebase.enumerar_estados()), 1000):
+            byte = valores[tablebase.indice_estado(estado)]
+            assert tabla.valor(estado) == (byte - 256 if byte > 127 else byte)
+        # Cada tabla verifica su propia cabecera
+        with pytest.raises(ValueError):
+            tablebase.Tablebase(ruta)
+    finally:
+        tabla.cerrar()
@@ -0,0 +1,94 @@
+# Pruebas del registro binario de partidas: escritura, lectura y reconstrucción
+#   python -m pytest -q
+import random
+
+import pytest
+
+import registro
+from backend import TicTacToe
+
+
+def _jugar_al_azar(juego, rng, limite=40):
+    """Juega al azar hasta que alguien gana o se llega al límite; retorna el ganador o None"""
+    for _ in range(limite):
+        jugador = juego.jugador_actual
+        juego.hacer_movimiento(rng.choice(juego.obtener_casillas_disponibles()))
+        if juego.verificar_ganador(jugador):
+            return jugador
+        juego.cambiar_turno()
+    return None
+
+
+@pytest.mark.parametrize('reglas', [(3, 3, 3), (5, 4, 4)])
+def test_ida_y_vuelta(tmp_path, reglas):
+    ruta = str(tmp_path / 'partidas.ttr')
+    escritor = registro.EscritorRegistro(ruta, *reglas)
+    rng = random.Random(0)
+    finales = []
+    for i in range(50):
+        juego = TicTacToe(*reglas)
+        partida = escritor.grabar(juego, f'x{i}', 'CPU', 'dificil' if i % 2 else None)
+        ganador = _jugar_al_azar(juego, rng)
+        partida.terminar(ganador)
+        finales.append((ganador, juego.estado.clave(), juego.tablero))
+    escritor.cerrar()
+
+    lector = registro.LectorRegistro(ruta)
+    try:
+        assert (lector.tamano, lector.en_linea, lector.max_fichas) == reglas
+        partidas = list(lector)
+        assert len(partidas) == len(finales)
+        for i, (partida, (ganador, clave, tablero)) in enumerate(zip(partidas, finales)):
+            assert (partida.nombre_x, partida.nombre_o) == (f'x{i}', 'CPU')
+            assert partida.dificultad == ('dificil' if i % 2 else None)
+            assert partida.resultado == registro.RESULTADO_GANADOR.get(ganador, registro.SIN_TERMINAR)
+            juego = lector.reconstruir(partida)
+            assert juego.estado.clave() == clave and juego.tablero == tablero
+    finally:
+        lector.cerrar()
+
+
+def test_nombres_largos_se_cortan_sin_partir_caracteres(tmp_path):
+    ruta = str(tmp_path / 'partidas.ttr')
+    escritor = registro.EscritorRegistro(ruta)
+    nombre = 'ñ' * 200  # 400 bytes en UTF-8
+    escritor.escribir(nombre, 'O', None, registro.TABLAS, bytes([4, 0]))
+    escritor.cerrar()
+
+    lector = registro.LectorRegistro(ruta)
+    try:
+        partida, = lector
+        assert partida.nombre_x == 'ñ' * 127
+        assert partida.resultado == registro.TABLAS
+    finally:
+        lector.cerrar()
+
+
+def test_partida_cortada_al_final_se_ignora(tmp_path):
+    ruta = str(tmp_path / 'partidas.ttr')
+    escritor = registro.EscritorRegistro(ruta)
+    escritor.escribir('a', 'b', 'medio', registro.GANA_X, bytes([4, 0, 2, 1, 6]))
+    escritor.escribir('c', 'd', 'medio', registro.GANA_O, bytes([4, 0, 2, 1, 6, 3]))
+    escritor.cerrar()
+    with open(ruta, 'rb') as f:
+        datos = f.read()
+
+    # Cada corte del archivo deja solo las partidas completas, sin errores
+    primera = registro.TAM_CABECERA + len(b'\x01a\x01b\x05medio') + registro.CANTIDAD.size + 5
+    for largo in range(registro.TAM_CABECERA, len(datos) + 1):
+        with open(ruta, 'wb') as f:
+            f.write(datos[:largo])
+        lector = registro.LectorRegistro(ruta)
+        try:
+            nombres = [partida.nombre_x for partida in lector]
+        finally:
+            lector.cerrar()
+        esperados = ['a', 'c'][:(largo >= primera) + (largo == len(datos))]
+        assert nombres == esperados, largo
+
+
+def test_reglas_distintas_se_rechazan(tmp_path):
+    ruta = str(tmp_path / 'partidas.ttr')
+    registro.EscritorRegistro(ruta).cerrar()
+    with pytest.raises(ValueError):
+        registro.EscritorRegistro(ruta, 4, 4, 4)
@@ -0,0 +1,57 @@
+# Pruebas del protocolo del servidor, sin red: se llama directamente a Servidor.procesar
+#   python -m pytest -q
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import registro
+from servidor import ErrorProtocolo, Servidor
+
+
+@pytest.fixture
+def servidor(tmp_path):
+    with ThreadPoolExecutor(1) as ejecutor:
+        yield Servidor(ejecutor, str(tmp_path))
+
+
+def _procesar(servidor, propias, **peticion):
+    return asyncio.run(servidor.procesar(peticion, propias))
+
+
+@pytest.mark.parametrize('peticion', [[1, 2], 'nueva', 3, None])
+def test_peticion_que_no_es_objeto(servidor, peticion):
+    with pytest.raises(ErrorProtocolo):
+        asyncio.run(servidor.procesar(peticion, set()))
+
+
+@pytest.mark.parametrize('reglas', [
+    {'tamano': 1000}, {'tamano': 0}, {'en_linea': 4}, {'max_fichas': 0}, {'max_fichas': 17},
+    {'dificultad': 'xyz'}, {'dificultad': 3}, {'dificultad': ['dificil']},
+])
+def test_nueva_rechaza_reglas_invalidas(servidor, reglas):
+    propias = set()
+    with pytest.raises(ErrorProtocolo):
+        _procesar(servidor, propias, op='nueva', **reglas)
+    assert not propias and not servidor.sesiones
+
+
+def test_tablero_lleno_termina_en_tablas(servidor, tmp_path):
+    propias = set()
+    sesion = _procesar(servidor, propias, op='nueva', modo='1vs1', max_fichas=5)['sesion']
+    # Ninguna de las dos completa una línea y la novena ficha llena el tablero
+    for casilla in (0, 1, 2, 4, 3, 5, 7, 6, 8):
+        estado = _procesar(servidor, propias, op='mover', sesion=sesion, casilla=casilla)['estado']
+    assert estado['tablas'] and estado['ganador'] is None
+    with pytest.raises(ErrorProtocolo):
+        _procesar(servidor, propias, op='mover', sesion=sesion, casilla=0)
+
+    partidas = list(registro.LectorRegistro(str(tmp_path / 'partidas-3x3-3-5.ttr')))
+    assert [p.resultado for p in partidas] == [registro.TABLAS]
+
+
+def test_partida_contra_la_ia(servidor):
+    propias = set()
+    sesion = _procesar(servidor, propias, op='nueva', dificultad='dificil')['sesion']
+    respuesta = _procesar(servidor, propias, op='mover', sesion=sesion, casilla=4)
+    assert [j['jugador'] for j in respuesta['jugadas']] == ['X', 'O']
@@ -0,0 +1,39 @@
+# Pruebas de las estadísticas del torneo: Elo, SPRT y ratings
+#   python -m pytest -q
+import pytest
+
+import torneo
+
+ALFA = BETA = 0.05
+
+
+@pytest.mark.parametrize('victorias, tablas, derrotas, aceptada', [
+    (0, 0, 200, 'H0'),
+    (200, 0, 0, 'H1'),
+    (0, 200, 0, 'H1'),
+])
+def test_sprt_detiene_enfrentamientos_de_un_solo_lado(victorias, tablas, derrotas, aceptada):
+    inferior, superior = torneo.limites_sprt(ALFA, BETA)
+    llr = torneo.llr_sprt(victorias, tablas, derrotas, -10, 0)
+    assert llr <= inferior if aceptada == 'H0' else llr >= superior
+
+
+def test_sprt_sin_partidas_no_decide():
+    assert torneo.llr_sprt(0, 0, 0, -10, 0) == 0.0
+
+
+def test_sprt_sigue_el_signo_del_puntaje():
+    assert torneo.llr_sprt(30, 40, 30, -10, 0) > 0
+    assert torneo.llr_sprt(20, 40, 40, -10, 0) < 0
+
+
+def test_elo_con_intervalo_contiene_el_elo():
+    elo, minimo, maximo = torneo.elo_con_intervalo(60, 20, 20)
+    assert minimo < elo < maximo
+    assert elo == pytest.approx(torneo.elo_desde_puntaje(0.7))
+
+
+def test_ratings_sin_victorias_es_finito():
+    elos = torneo.ratings(['a', 'b'], {('a', 'b'): (0, 0, 50)})
+    assert elos['b'] > elos['a']
+    assert elos['a'] + elos['b'] == pytest.approx(0)
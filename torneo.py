@@ -0,0 +1,266 @@
+# Torneos entre configuraciones de IA con Elo e intervalo de confianza
+# Juega todos contra todos en un grupo de procesos. Cada par de partidas usa la
+# misma apertura al azar con los colores cambiados. Con dos jugadores puede
+# detenerse antes con un test secuencial (SPRT) apenas el resultado es claro.
+#
+#   python torneo.py medio dificil "dificil,tiempo_limite=0.002" --partidas 400
+#   python torneo.py dificil "dificil,limite_nodos=500" --sprt --elo0 -20 --elo1 0
+import argparse
+import math
+import random
+import time
+from itertools import combinations
+from multiprocessing import Pool
+
+from backend import TicTacToe, IA
+from autojuego import parsear_jugador, TABLAS_POR_REPETICION
+
+LIMITE_MOVIMIENTOS = 200
+PLIES_APERTURA = 2       # Jugadas al azar antes de que jueguen las IA
+PARES_POR_TAREA = 10
+Z_95 = 1.959964
+
+
+# IA reutilizadas dentro de cada proceso por (jugador, símbolo)
+_ias = {}
+
+
+def _ia(texto, simbolo, juego):
+    clave = (texto, simbolo)
+    if clave not in _ias:
+        dificultad, opciones = parsear_jugador(texto)
+        _ias[clave] = IA(TicTacToe(), simbolo, dificultad, **opciones)
+    ia = _ias[clave]
+    ia.juego = juego
+    return ia
+
+
+def generar_apertura(rng, plies=PLIES_APERTURA):
+    """Casillas al azar desde el tablero vacío sin que nadie gane"""
+    while True:
+        juego = TicTacToe()
+        apertura = []
+        for _ in range(plies):
+            casilla = rng.choice(juego.obtener_casillas_disponibles())
+            juego.hacer_movimiento(casilla)
+            apertura.append(casilla)
+            if juego.verificar_ganador(juego.jugador_actual):
+                break
+            juego.cambiar_turno()
+        else:
+            return apertura
+
+
+def jugar_partida(jugador_x, jugador_o, apertura=(), limite=LIMITE_MOVIMIENTOS,
+                  repeticiones=TABLAS_POR_REPETICION):
+    """Retorna 'X', 'O' o None (tablas por límite de movimientos o por repetición)"""
+    juego = TicTacToe(tablas_por_repeticion=repeticiones, limite_movimientos=limite)
+    ias = {'X': _ia(jugador_x, 'X', juego), 'O': _ia(jugador_o, 'O', juego)}
+    movimiento = 0
+    while True:
+        if movimiento < len(apertura):
+            casilla = apertura[movimiento]
+        else:
+            casilla = ias[juego.jugador_actual].obtener_movimiento()
+        movimiento += 1
+        juego.hacer_movimiento(casilla)
+        if juego.verificar_ganador(juego.jugador_actual):
+            return juego.jugador_actual
+        juego.cambiar_turno()
+        if juego.verificar_tablas():
+            return None
+
+
+def _jugar_tanda(tarea):
+    """Punto de entrada de los procesos: pares de partidas con colores alternados"""
+    a, b, semilla, pares, plies, limite, repeticiones = tarea
+    random.seed(semilla)  # La IA 'facil' usa el generador global
+    rng = random.Random(semilla)
+    victorias = tablas = derrotas = 0
+    for _ in range(pares):
+        apertura = generar_apertura(rng, plies)
+        for jugador_x, jugador_o, simbolo_a in ((a, b, 'X'), (b, a, 'O')):
+            ganador = jugar_partida(jugador_x, jugador_o, apertura, limite, repeticiones)
+            if ganador is None:
+                tablas += 1
+            elif ganador == simbolo_a:
+                victorias += 1
+            else:
+                derrotas += 1
+    return a, b, victorias, tablas, derrotas
+
+
+# --- Elo ---
+
+def puntaje_esperado(elo):
+    return 1 / (1 + 10 ** (-elo / 400))
+
+
+def elo_desde_puntaje(puntaje):
+    puntaje = min(max(puntaje, 1e-6), 1 - 1e-6)
+    return -400 * math.log10(1 / puntaje - 1)
+
+
+def _puntaje_y_varianza(victorias, tablas, derrotas):
+    """Puntaje medio por partida y su varianza por partida"""
+    n = victorias + tablas + derrotas
+    puntaje = (victorias + tablas / 2) / n
+    varianza = (victorias * (1 - puntaje) ** 2 + tablas * (0.5 - puntaje) ** 2
+                + derrotas * puntaje ** 2) / n
+    return puntaje, varianza
+
+
+def elo_con_intervalo(victorias, tablas, derrotas, z=Z_95):
+    """Retorna (elo, mínimo, máximo) del primer jugador con el intervalo de confianza dado"""
+    n = victorias + tablas + derrotas
+    puntaje, varianza = _puntaje_y_varianza(victorias, tablas, derrotas)
+    margen = z * math.sqrt(varianza / n)
+    return (elo_desde_puntaje(puntaje), elo_desde_puntaje(puntaje - margen),
+            elo_desde_puntaje(puntaje + margen))
+
+
+def llr_sprt(victorias, tablas, derrotas, elo0, elo1):
+    """
+    Logaritmo del cociente de verosimilitud de H1 (diferencia elo1) contra H0
+    (diferencia elo0), con la aproximación normal del modelo trinomial.
+    """
+    n = victorias + tablas + derrotas
+    if not n:
+        return 0.0
+    puntaje, varianza = _puntaje_y_varianza(victorias, tablas, derrotas)
+    # Piso de la varianza: la que aporta una tabla virtual entre n + 1 partidas, como
+    # en ratings(). Sin él, un enfrentamiento con todas las partidas iguales (el
+    # resultado más claro) tendría varianza 0 y nunca cruzaría los límites
+    varianza = max(varianza, 1 / (4 * (n + 1)))
+    s0, s1 = puntaje_esperado(elo0), puntaje_esperado(elo1)
+    return n * (s1 - s0) * (2 * puntaje - s0 - s1) / (2 * varianza)
+
+
+def limites_sprt(alfa, beta):
+    """Retorna (inferior, superior): debajo se acepta H0, encima H1"""
+    return math.log(beta / (1 - alfa)), math.log((1 - beta) / alfa)
+
+
+def ratings(jugadores, resultados, iteraciones=200):
+    """
+    Elo de cada jugador por máxima verosimilitud (Bradley-Terry, tablas como
+    medio punto), con media 0. Cada enfrentamiento suma una tabla virtual para
+    que un jugador sin victorias no quede en menos infinito.
+    """
+    fuerza = {j: 1.0 for j in jugadores}
+    for _ in range(iteraciones):
+        nueva = {}
+        for j in jugadores:
+            puntos = 0.0
+            denominador = 0.0
+            for (a, b), (v, t, d) in resultados.items():
+                if j not in (a, b):
+                    continue
+                n = v + t + d + 1
+                ganados = (v + t / 2 + 0.5) if j == a else (d + t / 2 + 0.5)
+                rival = b if j == a else a
+                puntos += ganados
+                denominador += n / (fuerza[j] + fuerza[rival])
+            nueva[j] = puntos / denominador if denominador else 1.0
+        fuerza = nueva
+    elos = {j: 400 * math.log10(f) for j, f in fuerza.items()}
+    media = sum(elos.values()) / len(elos)
+    return {j: elo - media for j, elo in elos.items()}
+
+
+def ejecutar(jugadores, partidas, procesos=None, semilla=0, plies=PLIES_APERTURA,
+             limite=LIMITE_MOVIMIENTOS, sprt=None, al_progresar=None,
+             repeticiones=TABLAS_POR_REPETICION):
+    """
+    Juega `partidas` partidas por enfrentamiento (en pares de colores alternados).
+    sprt=(elo0, elo1, alfa, beta) detiene el torneo de dos jugadores en cuanto
+    el test decide. Retorna (resultados, decision) con resultados
+    {(a, b): [victorias de a, tablas, derrotas de a]} y decision 'H0', 'H1' o None.
+    """
+    pares = max(1, partidas // 2)
+    tareas = []
+    for i, (a, b) in enumerate(combinations(jugadores, 2)):
+        for inicio in range(0, pares, PARES_POR_TAREA):
+            cantidad = min(PARES_POR_TAREA, pares - inicio)
+            tareas.append((a, b, semilla + i * pares + inicio, cantidad, plies, limite, repeticiones))
+
+    resultados = {(a, b): [0, 0, 0] for a, b in combinations(jugadores, 2)}
+    decision = None
+    pool = None
+    try:
+        if procesos == 1:
+            tandas = map(_jugar_tanda, tareas)
+        else:
+            pool = Pool(procesos)
+            tandas = pool.imap_unordered(_jugar_tanda, tareas)
+        for a, b, victorias, tablas, derrotas in tandas:
+            acumulado = resultados[(a, b)]
+            acumulado[0] += victorias
+            acumulado[1] += tablas
+            acumulado[2] += derrotas
+            if al_progresar:
+                al_progresar(resultados)
+            if sprt is not None and len(jugadores) == 2:
+                elo0, elo1, alfa, beta = sprt
+                llr = llr_sprt(*acumulado, elo0, elo1)
+                inferior, superior = limites_sprt(alfa, beta)
+                if llr <= inferior:
+                    decision = 'H0'
+                elif llr >= superior:
+                    decision = 'H1'
+                if decision:
+                    break
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return resultados, decision
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Torneo todos contra todos entre configuraciones de IA")
+    parser.add_argument('jugadores', nargs='+',
+                        help="Como 'dificil' o 'dificil,tiempo_limite=0.01,profundidad=8'")
+    parser.add_argument('--partidas', type=int, default=200, help="Partidas por enfrentamiento")
+    parser.add_argument('--procesos', type=int, default=None)
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--apertura', type=int, default=PLIES_APERTURA, help="Jugadas al azar iniciales")
+    parser.add_argument('--limite', type=int, default=LIMITE_MOVIMIENTOS)
+    parser.add_argument('--repeticiones', type=int, default=TABLAS_POR_REPETICION,
+                        help="Tablas cuando una posición aparece tantas veces (0 no lo revisa)")
+    parser.add_argument('--sprt', action='store_true', help="Test secuencial (solo con dos jugadores)")
+    parser.add_argument('--elo0', type=float, default=-10.0, help="Diferencia de Elo bajo H0")
+    parser.add_argument('--elo1', type=float, default=0.0, help="Diferencia de Elo bajo H1")
+    parser.add_argument('--alfa', type=float, default=0.05)
+    parser.add_argument('--beta', type=float, default=0.05)
+    args = parser.parse_args(argv)
+    if len(set(args.jugadores)) < 2:
+        parser.error("Se necesitan al menos dos jugadores distintos")
+    if args.sprt and len(args.jugadores) != 2:
+        parser.error("El SPRT compara exactamente dos jugadores")
+
+    sprt = (args.elo0, args.elo1, args.alfa, args.beta) if args.sprt else None
+    inicio = time.perf_counter()
+    resultados, decision = ejecutar(args.jugadores, args.partidas, args.procesos, args.semilla,
+                                    args.apertura, args.limite, sprt,
+                                    repeticiones=args.repeticiones or None)
+    duracion = time.perf_counter() - inicio
+
+    total = sum(sum(r) for r in resultados.values())
+    for (a, b), (v, t, d) in resultados.items():
+        if v + t + d:
+            elo, minimo, maximo = elo_con_intervalo(v, t, d)
+            print(f"{a} vs {b}: +{v} ={t} -{d}  Elo {elo:+.0f} [{minimo:+.0f}, {maximo:+.0f}]")
+    print()
+    for jugador, elo in sorted(ratings(args.jugadores, resultados).items(), key=lambda p: -p[1]):
+        print(f"{elo:+8.0f}  {jugador}")
+    if sprt is not None:
+        llr = llr_sprt(*resultados[tuple(args.jugadores)], args.elo0, args.elo1)
+        inferior, superior = limites_sprt(args.alfa, args.beta)
+        veredicto = {'H0': f"H0 (Elo <= {args.elo0:+g})", 'H1': f"H1 (Elo >= {args.elo1:+g})",
+                     None: "sin decidir"}[decision]
+        print(f"\nSPRT: LLR {llr:.2f} en [{inferior:.2f}, {superior:.2f}] -> {veredicto}")
+    print(f"{total} partidas en {duracion:.1f} s")
+
+
+if __name__ == '__main__':
+    main()